@@ -0,0 +1,124 @@
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit
+
+_connection = None
+_connection_path = None
+_lock = threading.Lock()
+
+
+def open_database() -> sqlite3.Connection:
+    ''' Open download statistics database (shared by all processes) '''
+    global _connection
+    global _connection_path
+    from ..config import settings
+
+    database = settings.DOWNLOAD_STATS_DATABASE
+
+    # Re-use connection unless cache path was changed
+    if _connection is not None and _connection_path == database:
+        return _connection
+
+    if not os.path.exists(os.path.dirname(database)):
+        os.makedirs(os.path.dirname(database), exist_ok=True)
+
+    connection = sqlite3.connect(database, check_same_thread=False, isolation_level=None, timeout=10)
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('''
+        CREATE TABLE IF NOT EXISTS download_strategies (
+            host TEXT NOT NULL,
+            strategy TEXT NOT NULL,
+            successes INTEGER NOT NULL DEFAULT 0,
+            failures INTEGER NOT NULL DEFAULT 0,
+            last_success REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (host, strategy)
+        )
+    ''')
+
+    if _connection is not None:
+        _connection.close()
+    _connection = connection
+    _connection_path = database
+
+    return _connection
+
+
+def get_host(url: str) -> str:
+    ''' Get host name from URL '''
+    return urlsplit(url).netloc.lower()
+
+
+def get_strategies(url: str, strategies: list) -> list:
+    ''' Order download strategies for URL host: last successful first, then lowest failure rate '''
+    with _lock:
+        rows = open_database().execute(
+            'SELECT strategy, successes, failures, last_success FROM download_strategies WHERE host = ?',
+            (get_host(url),),
+        ).fetchall()
+    stats = {strategy: (successes, failures, last_success) for strategy, successes, failures, last_success in rows}
+
+    def rank(strategy):
+        successes, failures, last_success = stats.get(strategy, (0, 0, 0))
+        failure_rate = failures / (successes + failures) if successes + failures else 0
+        return -last_success, failure_rate, strategies.index(strategy)
+
+    return sorted(strategies, key=rank)
+
+
+def record(url: str, strategy: str, success: bool):
+    ''' Record download attempt result for URL host '''
+    with _lock:
+        connection = open_database()
+        connection.execute(
+            'INSERT OR IGNORE INTO download_strategies (host, strategy) VALUES (?, ?)',
+            (get_host(url), strategy),
+        )
+        if success:
+            connection.execute(
+                'UPDATE download_strategies SET successes = successes + 1, last_success = ? WHERE host = ? AND strategy = ?',
+                (time.time(), get_host(url), strategy),
+            )
+        else:
+            connection.execute(
+                'UPDATE download_strategies SET failures = failures + 1 WHERE host = ? AND strategy = ?',
+                (get_host(url), strategy),
+            )
+
+
+def get_stats(host=None) -> list:
+    ''' Get download statistics (attempts and failure rate) per host and strategy '''
+    query = 'SELECT host, strategy, successes, failures FROM download_strategies'
+    parameters = ()
+    if host:
+        query += ' WHERE host = ?'
+        parameters = (host.lower(),)
+
+    with _lock:
+        rows = open_database().execute(query + ' ORDER BY host, strategy', parameters).fetchall()
+
+    return [
+        {
+            'host': host,
+            'strategy': strategy,
+            'attempts': successes + failures,
+            'failure_rate': failures / (successes + failures) if successes + failures else 0,
+        }
+        for host, strategy, successes, failures in rows
+    ]
+
+
+def print_stats(host=None):
+    ''' Print download statistics per host and strategy '''
+    from .tools import cprint
+
+    stats = get_stats(host)
+    if not stats:
+        cprint('[INFO]\tNo download recorded')
+        return
+
+    cprint('[MAIN]\tDownload statistics')
+    print(f'{"Host":<40}{"Strategy":<15}{"Attempts":>10}{"Failure rate":>15}')
+    for stat in stats:
+        print(f'{stat["host"]:<40}{stat["strategy"]:<15}{stat["attempts"]:>10}{stat["failure_rate"]:>15.0%}')
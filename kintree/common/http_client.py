@@ -0,0 +1,108 @@
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Connections kept alive per host
+POOL_SIZE = 10
+# Maximum time to establish connection (seconds)
+CONNECT_TIMEOUT = 5
+
+# Browser headers (needed for requests to some suppliers, eg. Jameco)
+BROWSER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.106 Safari/537.36',
+    'Accept': 'application/json,image/webp,image/apng,image/*,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Cache-Control': 'no-cache',
+}
+
+
+def get_accept_encoding() -> str:
+    ''' Content encodings which can be decoded (brotli is optional) '''
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        try:
+            import brotlicffi  # noqa: F401
+        except ImportError:
+            return 'gzip, deflate'
+    return 'gzip, deflate, br'
+
+
+ACCEPT_ENCODING = get_accept_encoding()
+
+_sessions = {}
+_scrapers = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(url: str) -> requests.Session:
+    ''' Get keep-alive session for URL host (created on first request) '''
+    scheme, host = urlsplit(url)[:2]
+
+    with _sessions_lock:
+        session = _sessions.get((scheme, host), None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+            session.mount(f'{scheme}://', adapter)
+            session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+            session.headers['Connection'] = 'keep-alive'
+            _sessions[(scheme, host)] = session
+
+    return session
+
+
+def get_scraper(url: str):
+    ''' Get cloudscraper session for URL host (challenge cookies are kept for later requests) '''
+    import cloudscraper
+
+    scheme, host = urlsplit(url)[:2]
+
+    with _sessions_lock:
+        scraper = _scrapers.get((scheme, host), None)
+        if scraper is None:
+            scraper = cloudscraper.create_scraper()
+            # Keep cloudscraper adapter (TLS cipher suites), only resize its pool
+            adapter = scraper.get_adapter(f'{scheme}://')
+            adapter.init_poolmanager(1, POOL_SIZE, block=adapter._pool_block)
+            _scrapers[(scheme, host)] = scraper
+
+    return scraper
+
+
+def reset_scraper(url: str, scraper=None):
+    ''' Drop cloudscraper session for URL host (challenge will be solved again)
+
+    The session is not closed as other download threads may still be using it.
+    scraper: failed session, kept if another thread already replaced it
+    '''
+    scheme, host = urlsplit(url)[:2]
+
+    with _sessions_lock:
+        if scraper is None or _scrapers.get((scheme, host), None) is scraper:
+            _scrapers.pop((scheme, host), None)
+
+
+def get(url: str, timeout: float, browser_headers=False, headers=None, **kwargs) -> requests.Response:
+    ''' GET request using pooled connection for URL host '''
+    request_headers = dict(BROWSER_HEADERS) if browser_headers else {}
+    if headers:
+        request_headers.update(headers)
+
+    return get_session(url).get(url, headers=request_headers, timeout=timeout, allow_redirects=True, **kwargs)
+
+
+def post(url: str, timeout: float, headers=None, **kwargs) -> requests.Response:
+    ''' POST request using pooled connection for URL host '''
+    return get_session(url).post(url, headers=headers, timeout=timeout, **kwargs)
+
+
+def close_sessions():
+    ''' Close all pooled connections '''
+    with _sessions_lock:
+        for session in list(_sessions.values()) + list(_scrapers.values()):
+            session.close()
+        _sessions.clear()
+        _scrapers.clear()
@@ -1,6 +1,7 @@
 import builtins
 import json
 import os
+import threading
 from shutil import copyfile
 
 
@@ -60,48 +61,178 @@ def create_library(library_path: str, symbol: str, template_lib: str):
         copyfile(template_lib, new_kicad_sym_file)
 
 
-def get_image_with_retries(url, headers, retries=3, wait=5, silent=False):
-    """ Method to download image with cloudscraper library and retry attempts"""
-    import cloudscraper
+def get_image_with_retries(url, headers, retries=3, timeout=5, deadline=30, backoff=1, silent=False, **kwargs):
+    """ Method to download image with cloudscraper library and retry attempts (jittered exponential backoff) """
+    import random
     import time
-    scraper = cloudscraper.create_scraper()
+    from . import http_client
+
+    end = time.time() + deadline
     for attempt in range(retries):
+        # Re-use challenge cookies of previous downloads from same host
+        scraper = http_client.get_scraper(url)
         try:
-            response = scraper.get(url, headers=headers, timeout=wait)
-            if response.status_code == 200:
+            response = scraper.get(url, headers=headers, timeout=min(timeout, max(end - time.time(), 0.1)), **kwargs)
+            if response.status_code in [200, 206]:
                 return response
             else:
-                cprint(f'[INFO]\tWarning: Image download Attempt {attempt + 1} failed with status code {response.status_code}. Retrying in {wait} seconds...', silent=silent)
+                error = f'failed with status code {response.status_code}'
         except Exception as e:
-            cprint(f'[INFO]\tWarning: Image download Attempt {attempt + 1} encountered an error: {e}. Retrying in {wait} seconds...', silent=silent)
+            # Solve challenge again on next attempt
+            http_client.reset_scraper(url, scraper)
+            error = f'encountered an error: {e}'
+
+        if attempt + 1 == retries:
+            break
+        wait = random.uniform(0, backoff * 2 ** attempt)
+        if time.time() + wait >= end:
+            break
+        cprint(f'[INFO]\tWarning: Image download Attempt {attempt + 1} {error}. Retrying in {wait:.1f} seconds...', silent=silent)
         time.sleep(wait)
     cprint('[INFO]\tWarning: All Image download attempts failed. Could not retrieve the image.', silent=silent)
     return None
 
 
-def download(url, filetype='API data', fileoutput='', timeout=3, enable_headers=False, requests_lib=False, try_cloudscraper=False, silent=False):
-    ''' Standard method to download URL content, with option to save to local file (eg. images) '''
+# Network request errors (tracked per thread)
+REQUEST_TIMEOUT = 'timeout'
+REQUEST_HTTP_ERROR = 'http_error'
+REQUEST_QUOTA_EXCEEDED = 'quota_exceeded'
+_request_status = threading.local()
 
-    import socket
-    import urllib.request
-    import requests
 
-    # A more detailed headers was needed for request to Jameco
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.106 Safari/537.36',
-        'Accept': 'applicaiton/json,image/webp,image/apng,image/*,*/*;q=0.8',
-        'Accept-Encoding': 'Accept-Encoding: gzip, deflate, br',
-        'Accept-Language': 'en-US,en;q=0.9',
-        'Connection': 'keep-alive',
-        'Cache-Control': 'no-cache',
+def set_request_error(error: str):
+    ''' Record network error of last request in current thread '''
+    _request_status.error = error
+
+
+def get_request_error() -> str:
+    ''' Get network error recorded in current thread, if any '''
+    return getattr(_request_status, 'error', None)
+
+
+def clear_request_error():
+    ''' Clear network error recorded in current thread '''
+    _request_status.error = None
+
+
+def get_response_validators() -> dict:
+    ''' Get ETag and Last-Modified headers of last file downloaded in current thread '''
+    return getattr(_request_status, 'validators', {})
+
+
+# Size of downloaded chunks (bytes)
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# Bytes needed to detect downloaded file type
+SNIFF_SIZE = 1024
+
+
+def sniff_filetype(data: bytes) -> str:
+    ''' Detect file type from first bytes of file content (None if unknown) '''
+    if b'%PDF-' in data[:SNIFF_SIZE]:
+        return 'PDF'
+    if data.startswith((b'\x89PNG\r\n\x1a\n', b'\xff\xd8\xff', b'GIF87a', b'GIF89a', b'BM')):
+        return 'Image'
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'Image'
+    if data.lstrip()[:14].lower().startswith((b'<!doctype html', b'<html')):
+        return 'HTML'
+    return None
+
+
+def save_response(response, fileoutput: str, filetype: str, silent=False) -> str:
+    ''' Stream response content to partial file, then move it to output file once complete '''
+    from ..config import settings
+
+    max_size = settings.DOWNLOAD_MAX_SIZE_MB * 1024 * 1024
+    partial = fileoutput + '.part'
+
+    with response:
+        size = 0
+        mode = 'wb'
+        if response.status_code == 206:
+            # Check server resumes at end of partial file
+            content_range = response.headers.get('Content-Range', '')
+            start = content_range.replace('bytes ', '').split('-')[0]
+            if not os.path.isfile(partial) or start != str(os.path.getsize(partial)):
+                cprint(f'[INFO]\tWarning: {filetype} download could not be resumed', silent=silent)
+                if os.path.isfile(partial):
+                    os.remove(partial)
+                return None
+            size = os.path.getsize(partial)
+            mode = 'ab'
+
+        content_length = response.headers.get('Content-Length', '')
+        if max_size and content_length.isdigit() and size + int(content_length) > max_size:
+            cprint(f'[INFO]\tWarning: {filetype} download is too large ({size + int(content_length)} bytes)', silent=silent)
+            return None
+
+        # First bytes of file (content type detection)
+        head = b''
+        if size:
+            with open(partial, 'rb') as file:
+                head = file.read(SNIFF_SIZE)
+        checked = False
+
+        error = None
+        with open(partial, mode) as file:
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                if not checked:
+                    head += chunk[:SNIFF_SIZE]
+                    if len(head) >= SNIFF_SIZE:
+                        checked = True
+                        error = check_filetype(head, filetype, response)
+                        if error:
+                            break
+                size += len(chunk)
+                if max_size and size > max_size:
+                    error = f'is too large (more than {max_size} bytes)'
+                    break
+                file.write(chunk)
+
+        if not error and not checked:
+            error = check_filetype(head, filetype, response)
+
+    if error:
+        cprint(f'[INFO]\tWarning: {filetype} download {error}', silent=silent)
+        os.remove(partial)
+        return None
+
+    os.replace(partial, fileoutput)
+    # Used for conditional requests when refreshing file
+    _request_status.validators = {
+        'etag': response.headers.get('ETag', ''),
+        'last_modified': response.headers.get('Last-Modified', ''),
     }
+    return fileoutput
+
+
+def check_filetype(head: bytes, filetype: str, response) -> str:
+    ''' Check downloaded content matches expected file type, returns error (None if valid) '''
+    sniffed_filetype = sniff_filetype(head)
+    if sniffed_filetype:
+        if sniffed_filetype != filetype:
+            return 'returned the wrong file type'
+    elif filetype.lower() not in response.headers.get('Content-Type', '').lower():
+        # Unknown signature (eg. SVG images)
+        return 'returned the wrong file type'
+    return None
+
+
+def get_response_json(response):
+    ''' Parse API response, JSON error bodies are returned to caller (eg. API key errors) '''
+    if not response.ok:
+        if 'json' not in response.headers.get('Content-Type', '').lower():
+            response.raise_for_status()
+        set_request_error(REQUEST_HTTP_ERROR)
+    return response.json()
+
+
+def download(url, filetype='API data', fileoutput='', timeout=3, enable_headers=False, try_cloudscraper=False, silent=False):
+    ''' Standard method to download URL content, with option to save to local file (eg. images) '''
+
+    import requests
+    from . import http_client
 
-    # Set default timeout for download socket
-    socket.setdefaulttimeout(timeout)
-    if enable_headers and not requests_lib:
-        opener = urllib.request.build_opener()
-        opener.addheaders = list(headers.items())
-        urllib.request.install_opener(opener)
     try:
         if filetype == 'PDF':
             # some distributors/manufacturers implement
@@ -110,75 +241,74 @@ def download(url, filetype='API data', fileoutput='', timeout=3, enable_headers=
                 mpn = url.split('%2F')[-1]
                 url = f'https://www.ti.com/lit/ds/symlink/{mpn}.pdf'
         if filetype == 'Image' or filetype == 'PDF':
-            # Enable use of requests library for downloading files (some URLs do NOT work with urllib)
-            if requests_lib:
-                response = requests.get(url, headers=headers, timeout=timeout, allow_redirects=True)
-                if filetype.lower() not in response.headers['Content-Type'].lower():
-                    cprint(f'[INFO]\tWarning: {filetype} download returned the wrong file type', silent=silent)
-                    return None
-                with open(fileoutput, 'wb') as file:
-                    file.write(response.content)
-            elif try_cloudscraper:
-                response = get_image_with_retries(url, headers=headers)
-                if filetype.lower() not in response.headers['Content-Type'].lower():
-                    cprint(f'[INFO]\tWarning: {filetype} download returned the wrong file type', silent=silent)
+            # Resume interrupted download
+            partial = fileoutput + '.part'
+            headers = {}
+            if os.path.isfile(partial) and os.path.getsize(partial):
+                headers['Range'] = f'bytes={os.path.getsize(partial)}-'
+            if try_cloudscraper:
+                response = get_image_with_retries(url, headers={**http_client.BROWSER_HEADERS, **headers}, timeout=timeout, silent=silent, stream=True)
+                if response is None:
+                    if headers:
+                        # Start over on next attempt
+                        os.remove(partial)
                     return None
-                with open(fileoutput, 'wb') as file:
-                    file.write(response.content)
             else:
-                (file, headers) = urllib.request.urlretrieve(url, filename=fileoutput)
-                if filetype.lower() not in headers['Content-Type'].lower():
-                    cprint(f'[INFO]\tWarning: {filetype} download returned the wrong file type', silent=silent)
-                    return None
-            return file
+                response = http_client.get(url, timeout=timeout, browser_headers=enable_headers, headers=headers, stream=True)
+                if response.status_code == 416:
+                    # Partial file can't be resumed
+                    os.remove(partial)
+                response.raise_for_status()
+            return save_response(response, fileoutput, filetype, silent=silent)
         else:
-            # some suppliers work with requests.get(), others need urllib.request.urlopen()
+            # some suppliers only answer to browser requests
             try:
-                response = requests.get(url)
-                data_json = response.json()
-                return data_json
+                response = http_client.get(url, timeout=timeout, browser_headers=enable_headers)
+                return get_response_json(response)
             except requests.exceptions.JSONDecodeError:
-                try:
-                    url_data = urllib.request.urlopen(url)
-                    data = url_data.read()
-                    data_json = json.loads(data.decode('utf-8'))
-                    return data_json
-                finally:
-                    pass
-    except (socket.timeout, requests.exceptions.ConnectTimeout, requests.exceptions.ReadTimeout):
+                if enable_headers:
+                    raise
+                response = http_client.get(url, timeout=timeout, browser_headers=True)
+                return get_response_json(response)
+    except requests.exceptions.Timeout:
         cprint(f'[INFO]\tWarning: {filetype} download socket timed out ({timeout}s)', silent=silent)
-    except (urllib.error.HTTPError, requests.exceptions.ConnectionError):
-        cprint(f'[INFO]\tWarning: {filetype} download failed (HTTP Error)', silent=silent)
-    except (urllib.error.URLError, ValueError, AttributeError):
-        cprint(f'[INFO]\tWarning: {filetype} download failed (URL Error)', silent=silent)
+        set_request_error(REQUEST_TIMEOUT)
     except requests.exceptions.SSLError:
         cprint(f'[INFO]\tWarning: {filetype} download failed (SSL Error)', silent=silent)
+        set_request_error(REQUEST_HTTP_ERROR)
+    except (requests.exceptions.HTTPError, requests.exceptions.ConnectionError):
+        cprint(f'[INFO]\tWarning: {filetype} download failed (HTTP Error)', silent=silent)
+        set_request_error(REQUEST_HTTP_ERROR)
+    except (requests.exceptions.RequestException, ValueError, AttributeError):
+        cprint(f'[INFO]\tWarning: {filetype} download failed (URL Error)', silent=silent)
     except FileNotFoundError:
         cprint(f'[INFO]\tWarning: {os.path.dirname(fileoutput)} folder does not exist', silent=silent)
     return None
 
 
+# Download strategies (download arguments)
+DOWNLOAD_STRATEGIES = {
+    'plain': {},
+    'headers': {'enable_headers': True},
+    'cloudscraper': {'enable_headers': True, 'try_cloudscraper': True},
+}
+
+
 def download_with_retry(url: str, full_path: str, silent=False, **kwargs) -> str:
     ''' Standard method to download image URL to local file '''
+    from . import download_stats
 
     if not url:
         cprint('[INFO]\tError: Missing image URL', silent=silent)
         return False
     
-    # Try without headers
-    file = download(url, fileoutput=full_path, silent=silent, **kwargs)
-
-    if not file:
-        # Try with headers
-        file = download(url, fileoutput=full_path, enable_headers=True, silent=silent, **kwargs)
-
-    if not file:
-        # Try with requests library
-        file = download(url, fileoutput=full_path, enable_headers=True, requests_lib=True, silent=silent, **kwargs)
-    
-    if not file:
-        # Try with cloudscraper
-        file = download(url, fileoutput=full_path, enable_headers=True, requests_lib=False, try_cloudscraper=True, silent=silent, **kwargs)
+    # Start with strategy which last succeeded for this host
+    file = False
+    for strategy in download_stats.get_strategies(url, list(DOWNLOAD_STRATEGIES.keys())):
+        file = download(url, fileoutput=full_path, silent=silent, **DOWNLOAD_STRATEGIES[strategy], **kwargs)
+        download_stats.record(url, strategy, bool(file))
+        if file:
+            break
 
     # Still nothing
     if not file:
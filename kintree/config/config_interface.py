@@ -1,6 +1,9 @@
 import base64
 import copy
+import json
 import os
+import threading
+from collections import OrderedDict
 from sys import platform
 
 import yaml
@@ -9,8 +12,31 @@ from ..common.tools import cprint
 FUNCTION_FILTER_KEY = '__'
 
 
-def load_file(file_path: str, silent=True) -> dict:
-    ''' Safe load YAML file '''
+# Parsed YAML files, least recently used first (path: (modification time and size, data))
+FILE_CACHE_SIZE = 64
+_file_cache = OrderedDict()
+_file_cache_lock = threading.Lock()
+
+
+def load_file(file_path: str, silent=True, cache=True) -> dict:
+    ''' Safe load YAML file (parsed data is cached until file is modified, callers get a copy)
+
+        cache: keep parsed data in memory (disable for files read only once)
+    '''
+    cache_key = os.path.abspath(file_path)
+    stamp = get_file_stamp(file_path)
+    if stamp is None:
+        cprint(f'[ERROR]\tFile {file_path} does not exists!', silent=silent)
+        return None
+
+    if cache:
+        with _file_cache_lock:
+            cached = _file_cache.get(cache_key, None)
+            if cached:
+                _file_cache.move_to_end(cache_key)
+        if cached and cached[0] == stamp:
+            return copy.deepcopy(cached[1])
+
     try:
         with open(file_path, 'r') as file:
             try:
@@ -22,11 +48,22 @@ def load_file(file_path: str, silent=True) -> dict:
         cprint(f'[ERROR]\tFile {file_path} does not exists!', silent=silent)
         return None
 
-    return data
+    if not cache:
+        return data
+
+    with _file_cache_lock:
+        _file_cache[cache_key] = (stamp, data)
+        _file_cache.move_to_end(cache_key)
+        while len(_file_cache) > FILE_CACHE_SIZE:
+            _file_cache.popitem(last=False)
+    return copy.deepcopy(data)
 
 
 def dump_file(data: dict, file_path: str) -> bool:
     ''' Safe dump YAML file '''
+    with _file_cache_lock:
+        _file_cache.pop(os.path.abspath(file_path), None)
+
     with open(file_path, 'w') as file:
         try:
             if platform == "win32":
@@ -56,13 +93,36 @@ def load_user_paths(home_dir='') -> dict:
     return user_config
 
 
+def get_file_stamp(file_path: str) -> list:
+    ''' Get file modification time and size (None if file does not exist) '''
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
 def load_user_config_files(path_to_root: str, path_to_user_files: str, silent=True) -> bool:
     ''' Load user configuration files '''
     result = True
 
+    # Files are only merged with their template again if one of them changed
+    stamps_file = os.path.join(path_to_user_files, '.config_stamps.json')
+    try:
+        with open(stamps_file, 'r') as file:
+            stamps = json.load(file)
+    except (OSError, ValueError):
+        stamps = {}
+    new_stamps = {}
+
     def load_config(path):
         for template_file in os.listdir(path):
             filename = os.path.basename(template_file)
+            stamp = [get_file_stamp(os.path.join(path, filename)), get_file_stamp(os.path.join(path_to_user_files, filename))]
+            if stamps.get(filename, None) == stamp:
+                new_stamps[filename] = stamp
+                continue
+
             template_data = load_file(os.path.join(path, filename))
             try:
                 user_data = load_file(os.path.join(path_to_user_files, filename))
@@ -85,6 +145,7 @@ def load_user_config_files(path_to_root: str, path_to_user_files: str, silent=Tr
                 user_settings = template_data
 
             dump_file(user_settings, os.path.join(path_to_user_files, filename))
+            new_stamps[filename] = [get_file_stamp(os.path.join(path, filename)), get_file_stamp(os.path.join(path_to_user_files, filename))]
 
     for dir in ['user', 'inventree', 'kicad', 'digikey', 'mouser', 'element14', 'lcsc', 'tme', 'jameco', 'automationdirect']:
         try:
@@ -95,6 +156,13 @@ def load_user_config_files(path_to_root: str, path_to_user_files: str, silent=Tr
             cprint(f'[INFO]\tWarning: Failed to load {dir.title()} configuration', silent=silent)
             result = False
 
+    if new_stamps != stamps:
+        try:
+            with open(stamps_file, 'w') as file:
+                json.dump(new_stamps, file)
+        except OSError:
+            pass
+
     return result
 
 
@@ -124,6 +192,8 @@ def load_inventree_user_settings(user_config_path: str) -> dict:
 
     if 'DATASHEET_UPLOAD' not in user_settings:
         user_settings['DATASHEET_UPLOAD'] = False
+    if 'METADATA_VALID_MINUTES' not in user_settings:
+        user_settings['METADATA_VALID_MINUTES'] = 10
     if 'PRICING_UPLOAD' not in user_settings:
         user_settings['PRICING_UPLOAD'] = False
     return user_settings
@@ -150,6 +220,10 @@ def save_inventree_user_settings(enable: bool,
     user_settings['PROXIES'] = proxies
     user_settings['DATASHEET_UPLOAD'] = datasheet_upload
     user_settings['PRICING_UPLOAD'] = pricing_upload
+    # Keep settings which are not editable from the GUI
+    previous_settings = load_file(user_config_path, cache=False)
+    if isinstance(previous_settings, dict) and 'METADATA_VALID_MINUTES' in previous_settings:
+        user_settings['METADATA_VALID_MINUTES'] = previous_settings['METADATA_VALID_MINUTES']
 
     return dump_file(user_settings, user_config_path)
 
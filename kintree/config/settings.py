@@ -6,6 +6,17 @@ from enum import Enum
 from ..common.tools import cprint
 from .import config_interface
 
+# Settings loaded on first access (see __getattr__)
+LAZY_SETTINGS = {}
+
+
+def get_setting(name: str):
+    ''' Get setting from functions of this module (__getattr__ only applies to access from other modules) '''
+    if name in globals():
+        return globals()[name]
+    return __getattr__(name)
+
+
 # DEBUG
 # Testing
 ENABLE_TEST = False
@@ -101,39 +112,35 @@ load_ipn_settings()
 
 # GENERAL SETTINGS
 CONFIG_GENERAL_PATH = os.path.join(CONFIG_USER_FILES, 'general.yaml')
-CONFIG_GENERAL = config_interface.load_file(CONFIG_GENERAL_PATH)
+LAZY_SETTINGS['CONFIG_GENERAL'] = lambda: config_interface.load_file(CONFIG_GENERAL_PATH)
 # Datasheets
-DATASHEET_SAVE_ENABLED = CONFIG_GENERAL.get('DATASHEET_SAVE_ENABLED', False)
-DATASHEET_SAVE_PATH = CONFIG_GENERAL.get('DATASHEET_SAVE_PATH', '')
+LAZY_SETTINGS['DATASHEET_SAVE_ENABLED'] = lambda: get_setting('CONFIG_GENERAL').get('DATASHEET_SAVE_ENABLED', False)
+LAZY_SETTINGS['DATASHEET_SAVE_PATH'] = lambda: get_setting('CONFIG_GENERAL').get('DATASHEET_SAVE_PATH', '')
 # Open Browser
-AUTOMATIC_BROWSER_OPEN = CONFIG_GENERAL.get('AUTOMATIC_BROWSER_OPEN', False)
+LAZY_SETTINGS['AUTOMATIC_BROWSER_OPEN'] = lambda: get_setting('CONFIG_GENERAL').get('AUTOMATIC_BROWSER_OPEN', False)
 # Default Supplier
-DEFAULT_SUPPLIER = CONFIG_GENERAL.get('DEFAULT_SUPPLIER', 'Digi-Key')
+LAZY_SETTINGS['DEFAULT_SUPPLIER'] = lambda: get_setting('CONFIG_GENERAL').get('DEFAULT_SUPPLIER', 'Digi-Key')
+
+# Enable flags
+LAZY_SETTINGS['ENABLE_KICAD'] = lambda: get_setting('CONFIG_GENERAL').get('ENABLE_KICAD', False)
+LAZY_SETTINGS['ENABLE_INVENTREE'] = lambda: get_setting('CONFIG_GENERAL').get('ENABLE_INVENTREE', False)
+LAZY_SETTINGS['ENABLE_ALTERNATE'] = lambda: get_setting('CONFIG_GENERAL').get('ENABLE_ALTERNATE', False)
+LAZY_SETTINGS['UPDATE_INVENTREE'] = lambda: get_setting('CONFIG_GENERAL').get('UPDATE_INVENTREE', False)
+LAZY_SETTINGS['CHECK_EXISTING'] = lambda: get_setting('CONFIG_GENERAL').get('CHECK_EXISTING', True)
 
 
 # Load enable flags
 def reload_enable_flags():
-    global ENABLE_KICAD
-    global ENABLE_INVENTREE
-    global ENABLE_ALTERNATE
-    global UPDATE_INVENTREE
-    global CHECK_EXISTING
-
     try:
-        ENABLE_KICAD = CONFIG_GENERAL.get('ENABLE_KICAD', False)
-        ENABLE_INVENTREE = CONFIG_GENERAL.get('ENABLE_INVENTREE', False)
-        ENABLE_ALTERNATE = CONFIG_GENERAL.get('ENABLE_ALTERNATE', False)
-        UPDATE_INVENTREE = CONFIG_GENERAL.get('UPDATE_INVENTREE', False)
-        CHECK_EXISTING = CONFIG_GENERAL.get('CHECK_EXISTING', True)
+        for flag in ['ENABLE_KICAD', 'ENABLE_INVENTREE', 'ENABLE_ALTERNATE', 'UPDATE_INVENTREE', 'CHECK_EXISTING']:
+            globals()[flag] = LAZY_SETTINGS[flag]()
         return True
-    except TypeError:
+    except AttributeError:
         pass
 
     return False
 
 
-reload_enable_flags()
-
 # Supported suppliers APIs
 CONFIG_SUPPLIERS_PATH = os.path.join(CONFIG_USER_FILES, 'suppliers.yaml')
 CONFIG_SUPPLIERS = config_interface.load_file(CONFIG_SUPPLIERS_PATH)
@@ -177,82 +184,159 @@ if not load_suppliers():
 # Generic API user configuration
 CONFIG_SUPPLIER_PARAMETERS = os.path.join(CONFIG_USER_FILES, 'supplier_parameters.yaml')
 CONFIG_SEARCH_API_PATH = os.path.join(CONFIG_USER_FILES, 'search_api.yaml')
-CONFIG_SEARCH_API = config_interface.load_file(CONFIG_SEARCH_API_PATH)
+LAZY_SETTINGS['CONFIG_SEARCH_API'] = lambda: config_interface.load_file(CONFIG_SEARCH_API_PATH)
 
 # Digi-Key user configuration
-CONFIG_DIGIKEY = config_interface.load_file(os.path.join(CONFIG_USER_FILES, 'digikey_config.yaml'))
+LAZY_SETTINGS['CONFIG_DIGIKEY'] = lambda: config_interface.load_file(os.path.join(CONFIG_USER_FILES, 'digikey_config.yaml'))
 CONFIG_DIGIKEY_API = os.path.join(CONFIG_USER_FILES, 'digikey_api.yaml')
 CONFIG_DIGIKEY_CATEGORIES = os.path.join(CONFIG_USER_FILES, 'digikey_categories.yaml')
 
 # Mouser user configuration
-CONFIG_MOUSER = config_interface.load_file(os.path.join(CONFIG_USER_FILES, 'mouser_config.yaml'))
+LAZY_SETTINGS['CONFIG_MOUSER'] = lambda: config_interface.load_file(os.path.join(CONFIG_USER_FILES, 'mouser_config.yaml'))
 CONFIG_MOUSER_API = os.path.join(CONFIG_USER_FILES, 'mouser_api.yaml')
 
 # Element14 user configuration (includes Farnell, Newark and Element14)
-CONFIG_ELEMENT14 = config_interface.load_file(os.path.join(CONFIG_USER_FILES, 'element14_config.yaml'))
+LAZY_SETTINGS['CONFIG_ELEMENT14'] = lambda: config_interface.load_file(os.path.join(CONFIG_USER_FILES, 'element14_config.yaml'))
 CONFIG_ELEMENT14_API = os.path.join(CONFIG_USER_FILES, 'element14_api.yaml')
 
 # LCSC user configuration
-CONFIG_LCSC = config_interface.load_file(os.path.join(CONFIG_USER_FILES, 'lcsc_config.yaml'))
+LAZY_SETTINGS['CONFIG_LCSC'] = lambda: config_interface.load_file(os.path.join(CONFIG_USER_FILES, 'lcsc_config.yaml'))
 CONFIG_LCSC_API = os.path.join(CONFIG_USER_FILES, 'lcsc_api.yaml')
 
 # JAMECO user configuration
-CONFIG_JAMECO = config_interface.load_file(os.path.join(CONFIG_USER_FILES, 'jameco_config.yaml'))
+LAZY_SETTINGS['CONFIG_JAMECO'] = lambda: config_interface.load_file(os.path.join(CONFIG_USER_FILES, 'jameco_config.yaml'))
 CONFIG_JAMECO_API = os.path.join(CONFIG_USER_FILES, 'jameco_api.yaml')
 
 # AUTOMATIONDIRECT user configuration
-CONFIG_AUTOMATIONDIRECT = config_interface.load_file(os.path.join(CONFIG_USER_FILES, 'automationdirect_config.yaml'))
+LAZY_SETTINGS['CONFIG_AUTOMATIONDIRECT'] = lambda: config_interface.load_file(os.path.join(CONFIG_USER_FILES, 'automationdirect_config.yaml'))
 CONFIG_AUTOMATIONDIRECT_API = os.path.join(CONFIG_USER_FILES, 'automationdirect_api.yaml')
 
 # TME user configuration
-CONFIG_TME = config_interface.load_file(os.path.join(CONFIG_USER_FILES, 'tme_config.yaml'))
+LAZY_SETTINGS['CONFIG_TME'] = lambda: config_interface.load_file(os.path.join(CONFIG_USER_FILES, 'tme_config.yaml'))
 CONFIG_TME_API = os.path.join(CONFIG_USER_FILES, 'tme_api.yaml')
 
 # Automatic category match confidence level (from 0 to 100)
-CATEGORY_MATCH_RATIO_LIMIT = CONFIG_SEARCH_API.get('CATEGORY_MATCH_RATIO_LIMIT', 100)
-# Search results caching (stored in files)
-CACHE_ENABLED = CONFIG_SEARCH_API.get('CACHE_ENABLED', True)
+LAZY_SETTINGS['CATEGORY_MATCH_RATIO_LIMIT'] = lambda: get_setting('CONFIG_SEARCH_API').get('CATEGORY_MATCH_RATIO_LIMIT', 100)
+# Maximum duration of each supplier search when searching all suppliers (seconds)
+LAZY_SETTINGS['SUPPLIER_SEARCH_TIMEOUT'] = lambda: float(get_setting('CONFIG_SEARCH_API').get('SUPPLIER_SEARCH_TIMEOUT', '25'))
+# Search results caching (stored in SQLite database)
+LAZY_SETTINGS['CACHE_ENABLED'] = lambda: get_setting('CONFIG_SEARCH_API').get('CACHE_ENABLED', True)
 # Cache validity in days
-CACHE_VALID_DAYS = int(CONFIG_SEARCH_API.get('CACHE_VALID_DAYS', '7'))
+LAZY_SETTINGS['CACHE_VALID_DAYS'] = lambda: int(get_setting('CONFIG_SEARCH_API').get('CACHE_VALID_DAYS', '7'))
+# SnapEDA responses validity in days
+LAZY_SETTINGS['CACHE_SNAPEDA_VALID_DAYS'] = lambda: int(get_setting('CONFIG_SEARCH_API').get('CACHE_SNAPEDA_VALID_DAYS', '3'))
+# Serve expired data while it is refreshed in the background (stale-while-revalidate)
+LAZY_SETTINGS['CACHE_STALE_WHILE_REVALIDATE'] = lambda: get_setting('CONFIG_SEARCH_API').get('CACHE_STALE_WHILE_REVALIDATE', False)
+# Maximum age of expired data served in days
+LAZY_SETTINGS['CACHE_STALE_VALID_DAYS'] = lambda: int(get_setting('CONFIG_SEARCH_API').get('CACHE_STALE_VALID_DAYS', '30'))
+# Failed searches validity in minutes (part not found / network errors)
+LAZY_SETTINGS['CACHE_NOT_FOUND_VALID_MINUTES'] = lambda: int(get_setting('CONFIG_SEARCH_API').get('CACHE_NOT_FOUND_VALID_MINUTES', '60'))
+LAZY_SETTINGS['CACHE_ERROR_VALID_MINUTES'] = lambda: int(get_setting('CONFIG_SEARCH_API').get('CACHE_ERROR_VALID_MINUTES', '5'))
+# Cached images and datasheets validity in days (since last access)
+LAZY_SETTINGS['CACHE_FILES_VALID_DAYS'] = lambda: int(get_setting('CONFIG_SEARCH_API').get('CACHE_FILES_VALID_DAYS', '30'))
+# Interval between two background sweeps of the cache directories
+LAZY_SETTINGS['CACHE_SWEEP_INTERVAL_HOURS'] = lambda: float(get_setting('CONFIG_SEARCH_API').get('CACHE_SWEEP_INTERVAL_HOURS', '1'))
+# Maximum size of downloaded images and datasheets (0 = unlimited)
+LAZY_SETTINGS['DOWNLOAD_MAX_SIZE_MB'] = lambda: int(get_setting('CONFIG_SEARCH_API').get('DOWNLOAD_MAX_SIZE_MB', '50'))
+
+
+# Cache size limits (0 = unlimited)
+def load_cache_limits() -> dict:
+    cache_limits = {}
+    for cache_name, max_size_mb, max_entries in [
+        ('search', 100, 20000),
+        ('images', 200, 5000),
+        ('datasheets', 1000, 5000),
+        ('downloads', 1000, 10000),
+    ]:
+        cache_limits[cache_name] = {
+            'max_size': int(get_setting('CONFIG_SEARCH_API').get(f'CACHE_{cache_name.upper()}_MAX_SIZE_MB', max_size_mb)) * 1024 * 1024,
+            'max_entries': int(get_setting('CONFIG_SEARCH_API').get(f'CACHE_{cache_name.upper()}_MAX_ENTRIES', max_entries)),
+        }
+
+    return cache_limits
+
+
+LAZY_SETTINGS['CACHE_LIMITS'] = load_cache_limits
+
+
+# Supplier API rate limits (0 = unlimited)
+def load_rate_limits() -> dict:
+    user_rate_limits = get_setting('CONFIG_SEARCH_API').get('SUPPLIER_RATE_LIMITS', None) or {}
+    rate_limits = {}
+    for supplier, requests_per_minute, daily_quota in [
+        ('Digi-Key', 120, 1000),
+        ('Mouser', 30, 1000),
+        # Farnell, Newark and Element14 share the same API key
+        ('Element14', 120, 1000),
+        ('LCSC', 60, 0),
+        ('Jameco', 60, 0),
+        ('TME', 300, 0),
+        ('AutomationDirect', 60, 0),
+    ]:
+        user_limits = user_rate_limits.get(supplier, None) or {}
+        rate_limits[supplier] = {
+            'requests_per_minute': int(user_limits.get('REQUESTS_PER_MINUTE', requests_per_minute)),
+            'daily_quota': int(user_limits.get('DAILY_QUOTA', daily_quota)),
+        }
+
+    return rate_limits
+
+
+LAZY_SETTINGS['SUPPLIER_RATE_LIMITS'] = load_rate_limits
+
+
+def get_cache_directory(name: str) -> str:
+    ''' Get cache directory path, created on first access '''
+    directory = os.path.join(USER_CACHE, name, '')
+    # Create folder if it does not exists
+    if not os.path.exists(directory):
+        os.makedirs(directory, exist_ok=True)
+    return directory
 
 
 # Caching settings
 def load_cache_settings():
-    global search_results
-    global search_images
-    global search_datasheets
-    global CACHE_ENABLED
+    global USER_CACHE
     global DIGIKEY_STORAGE_PATH
+    global RATE_LIMITS_DATABASE
+    global DOWNLOAD_STATS_DATABASE
+    global DOWNLOADS_DATABASE
+    global UPLOADS_DATABASE
 
     USER_SETTINGS = config_interface.load_user_paths(home_dir=HOME_DIR)
+    USER_CACHE = USER_SETTINGS['USER_CACHE']
 
-    search_results = {
-        'directory': os.path.join(USER_SETTINGS['USER_CACHE'], 'search', ''),
-        'extension': '.yaml',
-    }
-    # Create folder if it does not exists
-    if not os.path.exists(search_results['directory']):
-        os.makedirs(search_results['directory'])
-
-    # Part images
-    search_images = os.path.join(USER_SETTINGS['USER_CACHE'], 'images', '')
-    # Create folder if it does not exists
-    if not os.path.exists(search_images):
-        os.makedirs(search_images)
-
-    # Part images
-    search_datasheets = os.path.join(
-        USER_SETTINGS['USER_CACHE'], 'datasheets', '')
-    # Create folder if it does not exists
-    if not os.path.exists(search_datasheets):
-        os.makedirs(search_datasheets)
+    # Downloaded URLs index
+    DOWNLOADS_DATABASE = os.path.join(USER_SETTINGS['USER_CACHE'], 'downloads.db')
+    # Files uploaded to InvenTree (content hash index)
+    UPLOADS_DATABASE = os.path.join(USER_SETTINGS['USER_CACHE'], 'uploads.db')
 
     # API token storage path
     DIGIKEY_STORAGE_PATH = os.path.join(USER_SETTINGS['USER_CACHE'], '')
 
+    # Supplier API requests and daily quotas (shared by all processes)
+    RATE_LIMITS_DATABASE = os.path.join(USER_SETTINGS['USER_CACHE'], 'rate_limits.db')
+
+    # Download strategy which succeeded for each host (shared by all processes)
+    DOWNLOAD_STATS_DATABASE = os.path.join(USER_SETTINGS['USER_CACHE'], 'download_stats.db')
+
 
 # Load cache settings
 load_cache_settings()
+# Search results
+LAZY_SETTINGS['search_results'] = lambda: {
+    'directory': get_cache_directory('search'),
+    # Legacy search results files
+    'extension': '.yaml',
+    'database': os.path.join(get_cache_directory('search'), 'search_results.db'),
+}
+# Part images
+LAZY_SETTINGS['search_images'] = lambda: get_cache_directory('images')
+# Part datasheets
+LAZY_SETTINGS['search_datasheets'] = lambda: get_cache_directory('datasheets')
+# Downloaded files shared by parts (named after content hash)
+LAZY_SETTINGS['search_downloads'] = lambda: get_cache_directory('downloads')
 
 # KICAD
 # User Settings
@@ -284,27 +368,17 @@ def set_default_supplier(value: str, save=False):
     return
 
 
-# Library Paths
-if not ENABLE_TEST:
-    symbol_libraries_paths = config_interface.load_libraries_paths(
-        KICAD_CONFIG_CATEGORY_MAP,
-        KICAD_SETTINGS['KICAD_SYMBOLS_PATH'],
-    )
-# cprint(symbol_libraries_paths)
-
-# Template Paths
-symbol_templates_paths = config_interface.load_templates_paths(
+# Template Paths (scanned on first access)
+LAZY_SETTINGS['symbol_templates_paths'] = lambda: config_interface.load_templates_paths(
     KICAD_CONFIG_CATEGORY_MAP,
     KICAD_SETTINGS['KICAD_TEMPLATES_PATH'],
 )
-# cprint(symbol_templates_paths)
 
 # Footprint Libraries
-footprint_libraries_paths = config_interface.load_footprint_paths(
+LAZY_SETTINGS['footprint_libraries_paths'] = lambda: config_interface.load_footprint_paths(
     KICAD_CONFIG_CATEGORY_MAP,
     KICAD_SETTINGS['KICAD_FOOTPRINTS_PATH'],
 )
-# cprint(footprint_libraries_paths)
 footprint_name_default = 'TBD'
 
 AUTO_GENERATE_LIB = True
@@ -327,22 +401,30 @@ class Environment(Enum):
 
 
 # Pick environment
-environment = CONFIG_GENERAL.get('INVENTREE_ENV', None)
-environment = os.environ.get('INVENTREE_ENV', environment)
+def load_environment() -> int:
+    environment = get_setting('CONFIG_GENERAL').get('INVENTREE_ENV', None)
+    environment = os.environ.get('INVENTREE_ENV', environment)
+
+    try:
+        return int(environment)
+    except TypeError:
+        return 0
+
+
+LAZY_SETTINGS['environment'] = load_environment
 
-try:
-    environment = int(environment)
-except TypeError:
-    environment = 0
 
 # Load correct user file
-if environment == Environment.PRODUCTION.value:
-    INVENTREE_CONFIG = os.path.join(CONFIG_USER_FILES, 'inventree_prod.yaml')
-else:
-    INVENTREE_CONFIG = os.path.join(CONFIG_USER_FILES, 'inventree_dev.yaml')
+def get_inventree_config() -> str:
+    if get_setting('environment') == Environment.PRODUCTION.value:
+        return os.path.join(CONFIG_USER_FILES, 'inventree_prod.yaml')
+    return os.path.join(CONFIG_USER_FILES, 'inventree_dev.yaml')
+
+
+LAZY_SETTINGS['INVENTREE_CONFIG'] = get_inventree_config
 
 # Load user settings
-inventree_settings = config_interface.load_inventree_user_settings(INVENTREE_CONFIG)
+LAZY_SETTINGS['inventree_settings'] = lambda: config_interface.load_inventree_user_settings(get_setting('INVENTREE_CONFIG'))
 
 
 # Server settings
@@ -355,8 +437,9 @@ def load_inventree_settings():
     global PART_URL_ROOT
     global DATASHEET_UPLOAD
     global PRICING_UPLOAD
+    global METADATA_VALID_MINUTES
 
-    inventree_settings = config_interface.load_inventree_user_settings(INVENTREE_CONFIG)
+    inventree_settings = config_interface.load_inventree_user_settings(get_setting('INVENTREE_CONFIG'))
 
     SERVER_ADDRESS = inventree_settings.get('SERVER_ADDRESS', None)
     USERNAME = inventree_settings.get('USERNAME', None)
@@ -365,6 +448,7 @@ def load_inventree_settings():
     PROXIES = inventree_settings.get('PROXIES', None)
     DATASHEET_UPLOAD = inventree_settings.get('DATASHEET_UPLOAD', False)
     PRICING_UPLOAD = inventree_settings.get('PRICING_UPLOAD', False)
+    METADATA_VALID_MINUTES = float(inventree_settings.get('METADATA_VALID_MINUTES', 10) or 0)
     # Part URL
     if SERVER_ADDRESS:
         # If missing, append slash to root URL
@@ -396,9 +480,7 @@ inventree_part_template = {
 
 # Enable flags
 def set_enable_flag(key: str, value: bool):
-    global CONFIG_GENERAL
-
-    user_settings = CONFIG_GENERAL
+    user_settings = get_setting('CONFIG_GENERAL')
     if key in ['kicad', 'inventree', 'alternate', 'update', 'check_existing']:
         if key == 'kicad':
             user_settings['ENABLE_KICAD'] = value
@@ -418,3 +500,15 @@ def set_enable_flag(key: str, value: bool):
         )
 
     return reload_enable_flags()
+
+
+def __getattr__(name: str):
+    ''' Load lazy setting on first access, then keep it as module attribute '''
+    try:
+        loader = LAZY_SETTINGS[name]
+    except KeyError:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+    value = loader()
+    globals()[name] = value
+    return value
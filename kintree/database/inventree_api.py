@@ -1,9 +1,13 @@
 from ..config import settings
 import validators
 from ..common import part_tools
-from ..common.tools import cprint, download_with_retry
+from ..common.tools import cprint
 from ..config import config_interface
+from ..search import cache_manager, download_cache
+from . import upload_index
 import re
+import threading
+import time
 
 # Required to use local CA certificates on Linux
 # For more details, refer to https://github.com/sparkmicro/Ki-nTree/pull/45
@@ -21,7 +25,7 @@ from inventree.part import Part, PartCategory
 from inventree.currency import CurrencyManager
 from inventree.stock import StockLocation
 from inventree.stock import StockItem
-from inventree.base import ParameterTemplate, Parameter
+from inventree.base import Attachment, ParameterTemplate, Parameter
 
 
 def connect(server: str,
@@ -32,27 +36,86 @@ def connect(server: str,
             proxies=None,
             token='') -> bool:
     ''' Connect to InvenTree server and create API object '''
-    from wrapt_timeout_decorator import timeout
     global inventree_api
 
-    @timeout(dec_timeout=connect_timeout)
-    def get_inventree_api_timeout():
-        return InvenTreeAPI(server,
-                            username=username,
-                            password=password,
-                            proxies=proxies,
-                            token=token)
-
+    # Connect and read timeouts apply to each request (read timeout set by INVENTREE_API_TIMEOUT)
+    read_timeout = float(os.environ.get('INVENTREE_API_TIMEOUT', 10))
     try:
-        inventree_api = get_inventree_api_timeout()
+        inventree_api = InvenTreeAPI(server,
+                                     username=username,
+                                     password=password,
+                                     proxies=proxies,
+                                     token=token,
+                                     timeout=(connect_timeout, read_timeout))
     except:
         return False
 
+    # Metadata of previous server is not valid anymore
+    invalidate_metadata()
+
     if inventree_api.token:
         return True
     return False
 
 
+# Reference tables indexed by name and pk (fetched at most once per session, or per TTL)
+METADATA_MODELS = {
+    'templates': ParameterTemplate,
+    'categories': PartCategory,
+    'companies': Company,
+    'locations': StockLocation,
+}
+metadata_index = {}
+metadata_lock = threading.Lock()
+
+
+def is_metadata_valid(index: dict) -> bool:
+    ''' Check if index was fetched within METADATA_VALID_MINUTES (0: kept until invalidated) '''
+    valid_minutes = getattr(settings, 'METADATA_VALID_MINUTES', 10)
+    if not valid_minutes:
+        return True
+    return time.time() - index['timestamp'] < valid_minutes * 60
+
+
+def get_metadata(model: str) -> dict:
+    ''' Get index of InvenTree model items: {'by_pk': {pk: item}, 'by_name': {name: [items]}} '''
+    global inventree_api
+
+    with metadata_lock:
+        index = metadata_index.get(model, None)
+        if index and is_metadata_valid(index):
+            return index
+
+        index = {'timestamp': time.time(), 'by_pk': {}, 'by_name': {}}
+        for item in METADATA_MODELS[model].list(inventree_api):
+            index['by_pk'][item.pk] = item
+            index['by_name'].setdefault(item.name, []).append(item)
+        metadata_index[model] = index
+
+    return index
+
+
+def add_metadata(model: str, item):
+    ''' Add created item to index of InvenTree model items '''
+    with metadata_lock:
+        index = metadata_index.get(model, None)
+        if index and item and item.pk not in index['by_pk']:
+            index['by_pk'][item.pk] = item
+            index['by_name'].setdefault(item.name, []).append(item)
+            if 'by_path' in index:
+                index['by_path'][get_path(index, item)] = item.pk
+
+
+def invalidate_metadata(model=None):
+    ''' Drop index of InvenTree model items (all models if not specified) '''
+    with metadata_lock:
+        if model:
+            metadata_index.pop(model, None)
+        else:
+            metadata_index.clear()
+            parameter_index.clear()
+
+
 def set_inventree_db_test_mode():
     ''' InvenTree test database setup '''
     global inventree_api
@@ -60,142 +123,96 @@ def set_inventree_db_test_mode():
     inventree_api.patch('settings/global/PARAMETER_ENFORCE_UNITS/', {'value': False})
 
 
+def get_path(index: dict, item) -> tuple:
+    ''' Get names of item and its parents from index, starting at root '''
+    path = [item.name]
+    parent = index['by_pk'].get(getattr(item, 'parent', None), None)
+    while parent:
+        path.insert(0, parent.name)
+        parent = index['by_pk'].get(parent.parent, None)
+    return tuple(path)
+
+
+def get_path_index(model: str) -> dict:
+    ''' Get index of InvenTree tree items (categories, locations) by path: {(root name, ..., name): pk} '''
+    index = get_metadata(model)
+    with metadata_lock:
+        if 'by_path' not in index:
+            index['by_path'] = {get_path(index, item): pk for pk, item in index['by_pk'].items()}
+    return index['by_path']
+
+
+def find_tree_item_id(model: str, tree: list) -> int:
+    ''' Get ID of InvenTree tree item from its path (or its name if unique) '''
+    pk = get_path_index(model).get(tuple(tree), None)
+    if pk:
+        return pk
+
+    # Path does not start at root
+    items = get_metadata(model)['by_name'].get(tree[-1], [])
+    if len(items) == 1:
+        return items[0].pk
+    elif len(tree) > 1:
+        # Match the parent item
+        parent_id = find_tree_item_id(model, tree[:-1])
+        for item in items:
+            if item.parent == parent_id:
+                return item.pk
+
+    return -1
+
+
+def get_tree_item_id(model: str, tree: list) -> int:
+    ''' Get ID of InvenTree tree item, reload index once if not found (eg. created by another client) '''
+    if not tree:
+        return -1
+
+    pk = find_tree_item_id(model, tree)
+    if pk < 0:
+        invalidate_metadata(model)
+        pk = find_tree_item_id(model, tree)
+    return pk
+
+
 def get_inventree_category_id(category_tree: list) -> int:
     ''' Get InvenTree category ID from name, specificy parent if subcategory '''
-    global inventree_api
+    return get_tree_item_id('categories', category_tree)
 
-    # Fetch all categories
-    part_categories = PartCategory.list(inventree_api, name=category_tree[-1])
-    if len(part_categories) == 1:
-        return part_categories[0].pk
-    else:
-        if len(category_tree) > 1:
-            # Match the parent category
-            parent_category_id = get_inventree_category_id(category_tree[:-1])
-            if parent_category_id:
-                for category in part_categories:
-                    try:
-                        if parent_category_id == category.getParentCategory().pk:
-                            return category.pk
-                    except AttributeError:
-                        pass
-                    #     # Check parent id match (if passed as argument)
-                    #     match = True
-                    #     if parent_category_id:
-                    #         cprint(f'[TREE]\t{item.getParentCategory().pk} ?= {parent_category_id}', silent=settings.HIDE_DEBUG)
-                    #         if item.getParentCategory().pk != parent_category_id:
-                    #             match = False
-                    #     if match:
-                    #         cprint(f'[TREE]\t{item.name} ?= {category_name} => True', silent=settings.HIDE_DEBUG)
-                    #         return item.pk
-                    # else:
-                    #     cprint(f'[TREE]\t{item.name} ?= {category_name} => False', silent=settings.HIDE_DEBUG)
 
-    return -1
+def get_inventree_stock_location_id(stock_location_tree: list) -> int:
+    ''' Get InvenTree stock location ID from name, specificy parent if sublocation '''
+    return get_tree_item_id('locations', stock_location_tree)
 
 
-def get_inventree_stock_location_id(stock_location_tree: list) -> int:
-    ''' Get InvenTree stock location ID from name, specificy parent if subcategory '''
-    global inventree_api
+def build_tree(items: list) -> dict:
+    ''' Build nested {name: children} tree from flat list of InvenTree items (leaves are None) '''
+    children = {}
+    pks = set(item.pk for item in items)
+    for item in items:
+        # Items which parent is not listed are placed at the root
+        parent = item.parent if item.parent in pks else None
+        children.setdefault(parent, []).append(item)
 
-    # Fetch all categories
-    stock_locations = StockLocation.list(inventree_api, name=stock_location_tree[-1])
-    if len(stock_locations) == 1:
-        return stock_locations[0].pk
-    else:
-        if len(stock_location_tree) > 1:
-            # Match the parent category
-            parent_stock_location_id = get_inventree_category_id(stock_location_tree[:-1])
-            if parent_stock_location_id:
-                for location in stock_locations:
-                    try:
-                        if parent_stock_location_id == location.getParentLocation().pk:
-                            return location.pk
-                    except AttributeError:
-                        pass
-                    #     # Check parent id match (if passed as argument)
-                    #     match = True
-                    #     if parent_stock_location_id:
-                    #         cprint(f'[TREE]\t{item.getParentCategory().pk} ?= {parent_stock_location_id}', silent=settings.HIDE_DEBUG)
-                    #         if item.getParentCategory().pk != parent_stock_location_id:
-                    #             match = False
-                    #     if match:
-                    #         cprint(f'[TREE]\t{item.name} ?= {category_name} => True', silent=settings.HIDE_DEBUG)
-                    #         return item.pk
-                    # else:
-                    #     cprint(f'[TREE]\t{item.name} ?= {category_name} => False', silent=settings.HIDE_DEBUG)
+    def add_children(parent) -> dict:
+        if parent not in children:
+            return None
+        return {item.name: add_children(item.pk) for item in children[parent]}
 
-    return -1
+    return add_children(None) or {}
 
 
 def get_categories() -> dict:
     '''Fetch InvenTree categories'''
-    global inventree_api
-
-    categories = {}
-    # Get all categories (list)
-    db_categories = PartCategory.list(inventree_api)
-
-    def deep_add(tree: dict, keys: list, item: dict):
-        if len(keys) == 1:
-            try:
-                tree[keys[0]].update(item)
-            except (KeyError, AttributeError):
-                tree[keys[0]] = item
-            return
-        return deep_add(tree.get(keys[0]), keys[1:], item)
-
-    for category in db_categories:
-        parent = category.getParentCategory()
-        children = category.getChildCategories()
-
-        if not parent and not children:
-            categories[category.name] = None
-            continue
-        elif parent:
-            parent_list = []
-            while parent:
-                parent_list.insert(0, parent.name)
-                parent = parent.getParentCategory()
-            cat = {category.name: None}
-            deep_add(categories, parent_list, cat)
-
-    return categories
+    # Reload categories from database
+    invalidate_metadata('categories')
+    return build_tree(list(get_metadata('categories')['by_pk'].values()))
 
 
 def get_stock_locations() -> dict:
     '''Fetch InvenTree stock locations'''
-    global inventree_api
-
-    categories = {}
-    # Get all categories (list)
-    db_categories = StockLocation.list(inventree_api)
-
-    def deep_add(tree: dict, keys: list, item: dict):
-        if len(keys) == 1:
-            try:
-                tree[keys[0]].update(item)
-            except (KeyError, AttributeError):
-                tree[keys[0]] = item
-            return
-        return deep_add(tree.get(keys[0]), keys[1:], item)
-
-    for category in db_categories:
-        parent = category.getParentLocation()
-        children = category.getChildLocations()
-
-        if not parent and not children:
-            categories[category.name] = None
-            continue
-        elif parent:
-            parent_list = []
-            while parent:
-                parent_list.insert(0, parent.name)
-                parent = parent.getParentLocation()
-            cat = {category.name: None}
-            deep_add(categories, parent_list, cat)
-
-    return categories
+    # Reload stock locations from database
+    invalidate_metadata('locations')
+    return build_tree(list(get_metadata('locations')['by_pk'].values()))
 
 
 def get_category_tree(category_id: int) -> dict:
@@ -314,66 +331,156 @@ def fetch_part(part_id='', part_ipn='') -> int:
     return part
 
 
-def is_new_part(category_id: int, part_info: dict) -> int:
-    ''' Check if part exists based on parameters (or description) '''
+# Parameter values of parts per category, used to find duplicate parts
+# {category ID: {'timestamp': ..., 'parts': {part pk}, 'loaded': {part pk}, 'values': {template ID: {part pk: value}}, 'fingerprints': {}}}
+parameter_index = {}
+
+
+def get_parameter_index(category_id: int) -> dict:
+    ''' Get parameter index of parts in category and its direct subcategories '''
     global inventree_api
 
-    # Get category object
-    part_category = PartCategory(inventree_api, category_id)
+    with metadata_lock:
+        index = parameter_index.get(category_id, None)
+        if index and is_metadata_valid(index):
+            return index
 
     # Fetch all parts from category and subcategories
-    part_list = []
-    part_list.extend(part_category.getParts())
-    for subcategory in part_category.getChildCategories():
-        part_list.extend(subcategory.getParts())
+    categories = [category_id]
+    for category in get_metadata('categories')['by_pk'].values():
+        if category.parent == category_id:
+            categories.append(category.pk)
+    parts = set()
+    for category in categories:
+        for part in Part.list(inventree_api, category=category):
+            parts.add(part.pk)
+
+    index = {'timestamp': time.time(), 'parts': parts, 'loaded': set(), 'values': {}, 'fingerprints': {}}
+    with metadata_lock:
+        parameter_index[category_id] = index
+    return index
+
+
+def load_parameter_values(index: dict):
+    ''' Load parameter values of indexed parts (one listing per part, fetched concurrently) '''
+    from concurrent.futures import ThreadPoolExecutor
+    global inventree_api
+
+    def load(part_id: int) -> tuple:
+        return part_id, Parameter.list(inventree_api, model_type='part', model_id=part_id)
+
+    with metadata_lock:
+        part_ids = index['parts'] - index['loaded']
+    if not part_ids:
+        return
+
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS, thread_name_prefix='parameter_index') as executor:
+        for part_id, parameters in executor.map(load, part_ids):
+            with metadata_lock:
+                for parameter in parameters:
+                    index['values'].setdefault(parameter.template, {})[part_id] = parameter.data
+                index['loaded'].add(part_id)
+                index['fingerprints'] = {}
+
+
+def get_fingerprint_index(index: dict, template_ids: tuple) -> dict:
+    ''' Get indexed parts by values of parameter templates: {(value, ...): [part pk, ...]} '''
+    with metadata_lock:
+        if template_ids not in index['fingerprints']:
+            fingerprints = {}
+            for pk in index['parts']:
+                fingerprint = tuple(index['values'].get(template_id, {}).get(pk, None) for template_id in template_ids)
+                fingerprints.setdefault(fingerprint, []).append(pk)
+            index['fingerprints'][template_ids] = fingerprints
+        return index['fingerprints'][template_ids]
+
+
+def update_parameter_index(part_id: int, category_id=None, values=None):
+    ''' Add created part or parameter values ({template ID: value}) to parameter index '''
+    part_id = int(part_id)
+    # Parts of subcategories are indexed with their parent category
+    indexed_categories = [category_id]
+    if category_id is not None and parameter_index:
+        category = get_metadata('categories')['by_pk'].get(category_id, None)
+        if category:
+            indexed_categories.append(category.parent)
+
+    with metadata_lock:
+        for index_category_id, index in parameter_index.items():
+            if index_category_id in indexed_categories and part_id not in index['parts']:
+                # Created part has no parameters yet
+                index['parts'].add(part_id)
+                index['loaded'].add(part_id)
+            elif part_id not in index['parts']:
+                continue
+            for template_id, value in (values or {}).items():
+                index['values'].setdefault(template_id, {})[part_id] = value
+            # Rebuilt on next lookup
+            index['fingerprints'] = {}
+
+
+def remove_from_parameter_index(part_id: int):
+    ''' Remove deleted part from parameter index '''
+    with metadata_lock:
+        for index in parameter_index.values():
+            if part_id in index['parts']:
+                index['parts'].discard(part_id)
+                index['loaded'].discard(part_id)
+                for values in index['values'].values():
+                    values.pop(part_id, None)
+                index['fingerprints'] = {}
+
+
+def is_new_part(category_id: int, part_info: dict) -> int:
+    ''' Check if part exists based on parameters (or description) '''
+    from requests.exceptions import HTTPError
+    global inventree_api
 
     # Extract parameter from part info
     # Verify parameters values are not empty
     new_part_parameters = part_info['parameters'] if list(set(part_info['parameters'].values())) != ['-'] else None
 
-    template_list = ParameterTemplate.list(inventree_api)
-
-    def fetch_template_name(template_id):
-        for item in template_list:
-            if item.pk == template_id:
-                return item.name
-
     # Retrieve parent category name for parameters compare
+    categories = get_metadata('categories')['by_pk']
+    part_category = categories.get(category_id, None) or PartCategory(inventree_api, category_id)
     try:
-        category_name = part_category.getParentCategory().name
-    except AttributeError:
+        category_name = categories[part_category.parent].name
+    except KeyError:
         category_name = part_category.name
     filters = config_interface.load_category_parameters_filters(category=category_name,
                                                                 supplier_config_path=settings.CONFIG_PARAMETERS_FILTERS)
     # cprint(filters)
 
-    for part in part_list:
-        # TODO: This statement below seems erroneous...
-        # Compare fields (InvenTree does not allow those to be identicals between two parts)
-        # compare_fields = part_info['name'] == part.name and part_info['revision'] == part.revision
-        # if compare_fields:
-        #     cprint(f'[TREE]\tWarning: Found part with same name and revision (pk = {part.pk})', silent=settings.SILENT)
-        #     return part.pk
-
-        # Compare parameters
-        compare_parameters = False
-        # Get part parameters
-        db_part_parameters = part.getParameters()
-        part_parameters = {}
-        for parameter in db_part_parameters:
-            parameter_name = fetch_template_name(parameter.template)
-            parameter_value = parameter.data
-            part_parameters[parameter_name] = parameter_value
-
-        if new_part_parameters and part_parameters:
-            # Compare database part with new part
-            compare_parameters = part_tools.compare(new_part_parameters=new_part_parameters,
-                                                    db_part_parameters=part_parameters,
-                                                    include_filters=filters)
-                                                            
-        if compare_parameters:
-            cprint(f'[TREE]\tWarning: Found part with same parameters in database (pk = {part.pk})', silent=settings.SILENT)
-            return part.pk
+    # Compare parameters
+    if new_part_parameters:
+        # Parameters compared with database parts
+        names = sorted(name for name in new_part_parameters if not filters or name in filters)
+        templates = get_metadata('templates')['by_name']
+        if names and all(name in templates for name in names):
+            template_ids = tuple(templates[name][0].pk for name in names)
+            index = get_parameter_index(category_id)
+            load_parameter_values(index)
+            fingerprint = tuple(new_part_parameters[name] for name in names)
+
+            for pk in get_fingerprint_index(index, template_ids).get(fingerprint, []):
+                part_parameters = {}
+                for name, template_id in zip(names, template_ids):
+                    if pk in index['values'].get(template_id, {}):
+                        part_parameters[name] = index['values'][template_id][pk]
+
+                # Compare database part with new part
+                compare_parameters = part_tools.compare(new_part_parameters={name: new_part_parameters[name] for name in names},
+                                                        db_part_parameters=part_parameters,
+                                                        include_filters=filters)
+                if compare_parameters:
+                    # Confirm indexed part was not deleted from server
+                    try:
+                        Part(inventree_api, pk)
+                    except HTTPError:
+                        remove_from_parameter_index(pk)
+                        continue
+                    cprint(f'[TREE]\tWarning: Found part with same parameters in database (pk = {pk})', silent=settings.SILENT)
+                    return pk
 
     # Check if manufacturer part exists in database
     manufacturer = part_info['manufacturer_name']
@@ -396,21 +503,17 @@ def create_category(parent: str, name: str):
     is_new_category = False
 
     # Check if category already exists
-    category_list = PartCategory.list(inventree_api)
-    for category in category_list:
-        if name == category.name:
-            try:
-                # Check if parents are the same
-                if category.getParentCategory().name == parent:
-                    # Return category ID
-                    return category.pk, is_new_category
-            except:
-                return category.pk, is_new_category
-        elif parent == category.name:
-            # Get Parent ID
-            parent_id = category.pk
-        else:
-            pass
+    categories = get_metadata('categories')
+    for category in categories['by_name'].get(name, []):
+        parent_category = categories['by_pk'].get(category.parent, None)
+        # Check if parents are the same
+        if not parent_category or parent_category.name == parent:
+            # Return category ID
+            return category.pk, is_new_category
+
+    # Get Parent ID
+    for category in categories['by_name'].get(parent, []):
+        parent_id = category.pk
 
     if parent:
         if parent_id > 0:
@@ -436,10 +539,70 @@ def create_category(parent: str, name: str):
     except AttributeError:
         # User does not have the permission to create categories
         category_pk = 0
+    else:
+        add_metadata('categories', category)
 
     return category_pk, is_new_category
 
 
+# Servers which uploaded files index was checked for (once per session)
+upload_index_servers = set()
+
+
+def rebuild_upload_index() -> int:
+    ''' Rebuild index of uploaded files from InvenTree part images and attachments '''
+    global inventree_api
+
+    entries = []
+    # Uploaded images are named after their content hash
+    for thumbnail in inventree_api.get('part/thumbs/') or []:
+        image = os.path.basename(thumbnail.get('image', None) or '')
+        sha256 = upload_index.get_hash(image)
+        if sha256:
+            entries.append((upload_index.IMAGE, sha256, image))
+
+    # Uploaded attachments have their content hash in comment
+    for attachment in Attachment.list(inventree_api, model_type='part'):
+        sha256 = upload_index.get_hash(attachment.comment)
+        if sha256 and attachment.attachment:
+            entries.append((upload_index.ATTACHMENT, sha256, f'{inventree_api.base_url.strip("/")}{attachment.attachment}'))
+
+    return upload_index.rebuild(inventree_api.base_url, entries)
+
+
+def get_uploaded_file(kind: str, sha256: str) -> str:
+    ''' Find file with same content already uploaded to InvenTree '''
+    global inventree_api
+    global upload_index_servers
+
+    if inventree_api.base_url not in upload_index_servers:
+        upload_index_servers.add(inventree_api.base_url)
+        if not upload_index.count(inventree_api.base_url):
+            # Index was never built for this server
+            try:
+                rebuild_upload_index()
+            except Exception:
+                pass
+
+    return upload_index.load(inventree_api.base_url, kind, sha256)
+
+
+def find_uploaded_attachment(sha256: str) -> str:
+    ''' Get link of part attachment with same content on InvenTree server (None if it was deleted) '''
+    global inventree_api
+
+    try:
+        # Content hash is kept in attachment comment
+        attachments = Attachment.list(inventree_api, model_type='part', search=sha256)
+    except Exception:
+        return None
+
+    for attachment in attachments:
+        if upload_index.get_hash(attachment.comment) == sha256 and attachment.attachment:
+            return f'{inventree_api.base_url.strip("/")}{attachment.attachment}'
+    return None
+
+
 def upload_part_image(image_url: str, part_id: int, silent=False) -> bool:
     ''' Upload InvenTree part thumbnail'''
     global inventree_api
@@ -448,19 +611,34 @@ def upload_part_image(image_url: str, part_id: int, silent=False) -> bool:
     image_name = f'{str(part_id)}_thumbnail.jpeg'
     image_location = settings.search_images + image_name
 
-    # Download image (multiple attempts)
-    if not download_with_retry(image_url, image_location, filetype='Image', silent=silent):
+    # Download image (multiple attempts, shared by parts using the same image)
+    if not download_cache.download_file(image_url, image_location, filetype='Image', silent=silent):
         return False
+    cache_manager.notify_write()
 
-    # Upload image to InvenTree
     part = Part(inventree_api, part_id)
-    if part:
+    if not part:
+        return False
+
+    # Link image already uploaded for another part
+    sha256 = download_cache.hash_file(image_location)
+    existing_image = get_uploaded_file(upload_index.IMAGE, sha256)
+    if existing_image:
         try:
-            return part.uploadImage(image=image_location)
+            return part.save(data={'existing_image': existing_image})
         except Exception:
-            return False
-    else:
+            # Image was removed from server
+            upload_index.remove(inventree_api.base_url, upload_index.IMAGE, sha256)
+
+    # Upload image to InvenTree (named after content hash)
+    try:
+        with open(image_location, 'rb') as image:
+            response = part.save(data={}, files={'image': (f'{sha256}{os.path.splitext(image_name)[1]}', image)})
+    except Exception:
         return False
+    if response and response.get('image', None):
+        upload_index.save(inventree_api.base_url, upload_index.IMAGE, sha256, os.path.basename(response['image']))
+    return response
 
 
 def upload_part_datasheet(datasheet_url: str, part_ipn: int, part_pk: int, silent=False) -> str:
@@ -474,9 +652,10 @@ def upload_part_datasheet(datasheet_url: str, part_ipn: int, part_pk: int, silen
     else:
         datasheet_location = os.path.join(settings.search_datasheets, datasheet_name)
 
-    if not os.path.isfile(datasheet_location):
-        # Download datasheet (multiple attempts)
-        if not download_with_retry(
+    if not os.path.isfile(datasheet_location) or download_cache.is_expired(datasheet_url):
+        # Download datasheet (multiple attempts, shared by parts using the same datasheet)
+        # Expired datasheet is only downloaded again if modified
+        if not download_cache.download_file(
             datasheet_url,
             datasheet_location,
             filetype='PDF',
@@ -484,18 +663,40 @@ def upload_part_datasheet(datasheet_url: str, part_ipn: int, part_pk: int, silen
             silent=silent,
         ):
             return ''
+        cache_manager.notify_write()
+    elif not settings.DATASHEET_SAVE_ENABLED:
+        # Track access to cached datasheet
+        cache_manager.touch(datasheet_location)
 
-    # Upload Datasheet to InvenTree
     part = Part(inventree_api, part_pk)
-    if part:
-        try:
-            attachment = part.uploadAttachment(attachment=datasheet_location)
-            return f'{inventree_api.base_url.strip("/")}{attachment["attachment"]}'
-        except Exception:
-            return ''
-    else:
+    if not part:
         return ''
 
+    # Link datasheet already uploaded for another part
+    sha256 = download_cache.hash_file(datasheet_location)
+    existing_datasheet = get_uploaded_file(upload_index.ATTACHMENT, sha256)
+    if existing_datasheet:
+        # Check attachment was not deleted from server
+        existing_datasheet = find_uploaded_attachment(sha256)
+        if existing_datasheet:
+            upload_index.save(inventree_api.base_url, upload_index.ATTACHMENT, sha256, existing_datasheet)
+            try:
+                part.addLinkAttachment(existing_datasheet)
+                return existing_datasheet
+            except Exception:
+                pass
+        else:
+            upload_index.remove(inventree_api.base_url, upload_index.ATTACHMENT, sha256)
+
+    # Upload Datasheet to InvenTree
+    try:
+        attachment = part.uploadAttachment(attachment=datasheet_location, comment=f'sha256:{sha256}')
+        datasheet_link = f'{inventree_api.base_url.strip("/")}{attachment["attachment"]}'
+    except Exception:
+        return ''
+    upload_index.save(inventree_api.base_url, upload_index.ATTACHMENT, sha256, datasheet_link)
+    return datasheet_link
+
 
 def create_part(category_id: int, name: str, description: str, revision: str, ipn: str, keywords=None) -> int:
     ''' Create InvenTree part '''
@@ -520,6 +721,7 @@ def create_part(category_id: int, name: str, description: str, revision: str, ip
         return 0
 
     if part:
+        update_parameter_index(part.pk, category_id=category_id)
         return part.pk
     else:
         return 0
@@ -563,6 +765,7 @@ def create_company(company_name: str, manufacturer=False, supplier=False) -> boo
         'is_supplier': supplier,
         'is_manufacturer': manufacturer,
     })
+    add_metadata('companies', company)
 
     return company
 
@@ -571,9 +774,8 @@ def get_all_companies() -> dict:
     ''' Get all existing companies (supplier/manufacturer) from database '''
     global inventree_api
 
-    company_list = Company.list(inventree_api)
     companies = {}
-    for company in company_list:
+    for company in get_metadata('companies')['by_pk'].values():
         companies[company.name] = company.pk
 
     return companies
@@ -597,10 +799,10 @@ def is_new_manufacturer_part(manufacturer_name: str, manufacturer_mpn: str, crea
 
     # Fetch all companies
     cprint('[TREE]\tFetching manufacturers', silent=settings.HIDE_DEBUG)
-    company_list = Company.list(inventree_api, is_manufacturer=True, is_customer=False)
     companies = {}
-    for company in company_list:
-        companies[company.name] = company
+    for company in get_metadata('companies')['by_pk'].values():
+        if company.is_manufacturer and not company.is_customer:
+            companies[company.name] = company
 
     try:
         # Get all parts
@@ -638,10 +840,10 @@ def is_new_supplier_part(supplier_name: str, supplier_sku: str):
 
     # Fetch all companies
     cprint('[TREE]\tFetching suppliers', silent=settings.HIDE_DEBUG)
-    company_list = Company.list(inventree_api, is_supplier=True, is_customer=False)
     companies = {}
-    for company in company_list:
-        companies[company.name] = company
+    for company in get_metadata('companies')['by_pk'].values():
+        if company.is_supplier and not company.is_customer:
+            companies[company.name] = company
 
     try:
         # Get all parts
@@ -820,10 +1022,8 @@ def create_parameter_template(name: str, units: str) -> int:
     ''' Create InvenTree parameter template '''
     global inventree_api
 
-    parameter_templates = ParameterTemplate.list(inventree_api)
-    for item in parameter_templates:
-        if name == item.name:
-            return 0
+    if name in get_metadata('templates')['by_name']:
+        return 0
 
     try:
         parameter_template = ParameterTemplate.create(inventree_api, {
@@ -832,72 +1032,101 @@ def create_parameter_template(name: str, units: str) -> int:
         })
     except:
         cprint(f'[TREE]\tError: Failed to create parameter template "{name}".', silent=settings.SILENT)
+        # Template may have been created by another client
+        invalidate_metadata('templates')
         return 0
 
     if parameter_template:
+        add_metadata('templates', parameter_template)
         return parameter_template.pk
     else:
         return 0
 
 
-def create_parameter(part_id: int, template_name: int, value: str):
-    ''' Create InvenTree part parameter based on template '''
-    global inventree_api
+# Maximum number of concurrent parameter requests
+MAX_CONCURRENT_REQUESTS = 4
 
-    parameter_template_list = ParameterTemplate.list(inventree_api)
 
-    template_id = 0
-    for item in parameter_template_list:
-        if template_name == item.name:
-            template_id = item.pk
-            break
+def print_parameter_error(error: Exception, action: str, template_name: str, value: str):
+    ''' Print InvenTree part parameter creation or update error '''
+    cprint(f'[TREE]\tError: Failed to {action} part parameter "{template_name}".', silent=settings.SILENT)
+    try:
+        if "Could not convert" in error.args[0]['body'].__str__():
+            cprint(f'[TREE]\tError: Parameter value "{value}" is not allowed by server settings.', silent=settings.SILENT)
+    except (IndexError, KeyError, TypeError):
+        pass
+
 
-    # Check if template_id already exists for this part
-    part = Part(inventree_api, part_id)
-    part_parameters = part.getParameters()
-    is_new_part_parameters_template_id = True
-    was_updated = False
-    parameter = None
-    for item in part_parameters:
-        # cprint(f'[TREE]\t{parameter.template} ?= {template_id}', silent=SILENT)
-        if item.template == template_id:
-            is_new_part_parameters_template_id = False
-            if settings.UPDATE_INVENTREE:
-                if value != item.data and value != '-':
-                    parameter = item
-                    was_updated = True
-                    try:
-                        parameter.save(data={
-                            'data': value
-                        })
-                    except Exception as e:
-                        cprint(f'[TREE]\tError: Failed to update part parameter "{template_name}".', silent=settings.SILENT)
-                        if "Could not convert" in e.args[0]['body'].__str__():
-                            cprint(f'[TREE]\tError: Parameter value "{value}" is not allowed by server settings.', silent=settings.SILENT)
-            break
-    # cprint(part_parameters, silent=SILENT)
+def upsert_parameters(part_id: int, parameters: dict):
+    ''' Create or update InvenTree part parameters, yields (template name, (parameter pk, is new, was updated))
 
+        Part parameters are fetched once, only missing or modified parameters are sent (concurrently)
     '''
-        Create parameter only if:
-        - template exists
-        - parameter does not exist for this part
-    '''
-    if template_id > 0 and is_new_part_parameters_template_id:
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    global inventree_api
+
+    def create(template_id: int, template_name: str, value: str) -> tuple:
         try:
             parameter = Parameter.create(inventree_api, {
                 'model_type': 'part',
-                'model_id': part.pk,
+                'model_id': part_id,
                 'template': template_id,
                 'data': value,
             })
         except Exception as e:
-            cprint(f'[TREE]\tError: Failed to create part parameter "{template_name}".', silent=settings.SILENT)
-            if "Could not convert" in e.args[0]['body'].__str__():
-                cprint(f'[TREE]\tError: Parameter value "{value}" is not allowed by server settings.', silent=settings.SILENT)
-
-    if parameter:
-        return parameter.pk, is_new_part_parameters_template_id, was_updated
-    else:
-        if template_id == 0:
-            cprint(f'[TREE]\tError: Parameter template "{template_name}" does not exist', silent=settings.SILENT)
+            print_parameter_error(e, 'create', template_name, value)
+            return 0, False, False
+        if parameter:
+            update_parameter_index(part_id, values={template_id: value})
+            return parameter.pk, True, False
         return 0, False, False
+
+    def update(parameter, template_name: str, value: str) -> tuple:
+        try:
+            parameter.save(data={
+                'data': value
+            })
+        except Exception as e:
+            print_parameter_error(e, 'update', template_name, value)
+            return parameter.pk, False, False
+        update_parameter_index(part_id, values={parameter.template: value})
+        return parameter.pk, False, True
+
+    templates = get_metadata('templates')['by_name']
+    # Existing part parameters by template ID
+    part_parameters = {}
+    for item in Parameter.list(inventree_api, model_type='part', model_id=part_id):
+        part_parameters.setdefault(item.template, item)
+
+    requests = {}
+    executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS, thread_name_prefix='part_parameters')
+    try:
+        for template_name, value in parameters.items():
+            try:
+                template_id = templates[template_name][0].pk
+            except KeyError:
+                cprint(f'[TREE]\tError: Parameter template "{template_name}" does not exist', silent=settings.SILENT)
+                yield template_name, (0, False, False)
+                continue
+
+            parameter = part_parameters.get(template_id, None)
+            if not parameter:
+                requests[executor.submit(create, template_id, template_name, value)] = template_name
+            elif settings.UPDATE_INVENTREE and value != parameter.data and value != '-':
+                requests[executor.submit(update, parameter, template_name, value)] = template_name
+            else:
+                # Parameter already up to date
+                yield template_name, (parameter.pk, False, False)
+
+        for request in as_completed(requests):
+            yield requests[request], request.result()
+    finally:
+        # Cancel pending requests if caller stops early
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def create_parameter(part_id: int, template_name: int, value: str):
+    ''' Create InvenTree part parameter based on template '''
+    for _, result in upsert_parameters(part_id, {template_name: value}):
+        return result
+    return 0, False, False
@@ -2,10 +2,10 @@ import copy
 
 from ..config import settings
 from ..common import part_tools, progress
-from ..common.tools import cprint
+from ..common.tools import cprint, clear_request_error, get_request_error
 from ..config import config_interface
 from ..database import inventree_api
-from ..search import search_api, automationdirect_api, digikey_api, mouser_api, element14_api, lcsc_api, jameco_api, tme_api
+from ..search import search_api, rate_limiter, suppliers
 
 category_separator = '/'
 
@@ -392,25 +392,10 @@ def translate_supplier_to_form(supplier: str, part_info: dict) -> dict:
 
     def get_value_from_user_key(user_key: str, default_key: str, default_value=None) -> str:
         ''' Get value mapped from user search key, else default search key '''
-        user_search_key = None
-        if supplier == 'Digi-Key':
-            user_search_key = settings.CONFIG_DIGIKEY.get(user_key, None)
-        elif supplier == 'Mouser':
-            user_search_key = settings.CONFIG_MOUSER.get(user_key, None)
-        elif supplier in ['Farnell', 'Newark', 'Element14']:
-            user_search_key = settings.CONFIG_ELEMENT14.get(user_key, None)
-        elif supplier == 'LCSC':
-            user_search_key = settings.CONFIG_LCSC.get(user_key, None)
-        elif supplier == 'Jameco':
-            user_search_key = settings.CONFIG_JAMECO.get(user_key, None)
-        elif supplier == 'TME':
-            user_search_key = settings.CONFIG_TME.get(user_key, None)
-        elif supplier == 'AutomationDirect':
-            user_search_key = settings.CONFIG_AUTOMATIONDIRECT.get(user_key, None)
-
-        else:
+        if not suppliers.is_supported(supplier):
             return default_value
-        
+        user_search_key = suppliers.get_user_search_key(supplier, user_key)
+
         # If no user key, use default
         if not user_search_key:
             return part_info.get(default_key, default_value)
@@ -421,24 +406,8 @@ def translate_supplier_to_form(supplier: str, part_info: dict) -> dict:
     # Check that supplier argument is valid
     if not supplier and supplier != 'custom':
         return part_form
-    # Get default keys
-    if supplier == 'Digi-Key':
-        default_search_keys = digikey_api.get_default_search_keys()
-    elif supplier == 'Mouser':
-        default_search_keys = mouser_api.get_default_search_keys()
-    elif supplier in ['Farnell', 'Newark', 'Element14']:
-        default_search_keys = element14_api.get_default_search_keys()
-    elif supplier == 'LCSC':
-        default_search_keys = lcsc_api.get_default_search_keys()
-    elif supplier == 'Jameco':
-        default_search_keys = jameco_api.get_default_search_keys()
-    elif supplier == 'TME':
-        default_search_keys = tme_api.get_default_search_keys()
-    elif supplier == 'AutomationDirect':
-        default_search_keys = automationdirect_api.get_default_search_keys()
-    else:
-        # Empty array of default search keys
-        default_search_keys = [''] * len(digikey_api.get_default_search_keys())
+    # Get default keys (empty for custom parts)
+    default_search_keys = suppliers.get_default_search_keys(supplier)
 
     # Default revision
     revision = settings.CONFIG_IPN.get('INVENTREE_DEFAULT_REV', '')
@@ -458,14 +427,32 @@ def translate_supplier_to_form(supplier: str, part_info: dict) -> dict:
     return part_form
 
 
-def supplier_search(supplier: str, part_number: str, test_mode=False) -> dict:
-    ''' Wrapper for supplier search, allow use of cached data (limited daily API calls) '''
+def supplier_fetch(supplier: str, part_number: str, store='', test_mode=False) -> dict:
+    ''' Fetch part data from supplier API, record failed searches '''
     part_info = {}
-    # Check part number exist
-    if not part_number:
-        cprint('\n[MAIN]\tError: Missing Part Number', silent=settings.SILENT)
-        return part_info
+    failure = None
+
+    clear_request_error()
+    try:
+        if suppliers.is_supported(supplier):
+            part_info = suppliers.fetch_part_info(supplier, part_number)
+    except Exception as e:
+        cprint(f'[INFO]\tWarning: {supplier} search failed ({repr(e)})', silent=settings.SILENT)
+        failure = search_api.ERROR
+    else:
+        if not part_info:
+            # Network errors expire faster than unknown part numbers
+            failure = get_request_error() or search_api.NOT_FOUND
+
+    # Record failed search (always search in test mode)
+    if failure and not test_mode:
+        search_api.save_failure(supplier, part_number, store, reason=failure)
 
+    return part_info
+
+
+def get_supplier_store(supplier: str) -> str:
+    ''' Get supplier store (Element14 stores), used to cache search results '''
     store = ''
     if supplier in ['Farnell', 'Newark', 'Element14']:
         try:
@@ -473,43 +460,201 @@ def supplier_search(supplier: str, part_number: str, test_mode=False) -> dict:
             store = element14_config.get(f'{supplier.upper()}_STORE', '').replace(' ', '')
         except AttributeError:
             cprint(f'\n[INFO]\tWarning: {supplier.upper()}_STORE value not found', silent=False)
+    return store
+
+
+def supplier_fetch_batch(supplier: str, part_numbers: list, store='', test_mode=False, order_codes=False) -> dict:
+    ''' Fetch data of several parts from supplier API (batched requests when supported), record failed searches '''
+    if not suppliers.supports_batch(supplier):
+        # One request per part
+        return {part_number: supplier_fetch(supplier, part_number, store, test_mode) for part_number in part_numbers}
+
+    failure = None
+    clear_request_error()
+    try:
+        parts_info = suppliers.fetch_parts_info(supplier, part_numbers, order_codes=order_codes)
+    except Exception as e:
+        cprint(f'[INFO]\tWarning: {supplier} search failed ({repr(e)})', silent=settings.SILENT)
+        parts_info = {}
+        failure = search_api.ERROR
+    else:
+        # Network errors expire faster than unknown part numbers
+        failure = get_request_error() or search_api.NOT_FOUND
+
+    # Record failed searches (always search in test mode)
+    for part_number in part_numbers:
+        if not parts_info.get(part_number, None) and not test_mode:
+            search_api.save_failure(supplier, part_number, store, reason=failure)
+
+    return parts_info
+
+
+def supplier_search_batch(supplier: str, part_numbers: list, test_mode=False, order_codes=False) -> dict:
+    ''' Search several part numbers with supplier, allow use of cached data
+
+    Parts which are not cached are fetched with batched API requests when supported by supplier
+    (order_codes: part numbers are supplier order codes, eg. Farnell/Newark/Element14).
+    Returns part data for each part number (empty if not found).
+    '''
+    parts_info = {}
+    store = get_supplier_store(supplier)
+
+    search_part_numbers = []
+    for part_number in dict.fromkeys(part_numbers):
+        if not part_number:
+            continue
+        # Get cached data, if cache is enabled (else returns None)
+        part_cache = search_api.load_from_cache(supplier, part_number, store, test_mode)
+        if part_cache:
+            parts_info[part_number] = part_cache
+        elif not test_mode and search_api.load_failure(supplier, part_number, store):
+            # Recently failed
+            parts_info[part_number] = {}
+        else:
+            search_part_numbers.append(part_number)
+
+    cprint(f'\n[MAIN]\tUsing {supplier} cached data for {len(parts_info)} parts', silent=settings.SILENT)
+    if search_part_numbers:
+        cprint(f'\n[MAIN]\t{supplier} search for {len(search_part_numbers)} parts', silent=settings.SILENT)
+        search_results = supplier_fetch_batch(supplier, search_part_numbers, store, test_mode, order_codes)
+
+        for part_number in search_part_numbers:
+            part_info = search_results.get(part_number, {})
+            if part_info:
+                search_api.save_to_cache(part_info, supplier, part_number, store)
+            else:
+                cprint(f'[INFO]\tError: Failed to fetch data for "{part_number}"', silent=settings.SILENT)
+            parts_info[part_number] = part_info
+
+        remaining = rate_limiter.get_remaining_quota(supplier)
+        if remaining is not None:
+            cprint(f'[INFO]\t{supplier}: {remaining} API requests left today', silent=settings.SILENT)
+
+    return parts_info
+
+
+def supplier_search(supplier: str, part_number: str, test_mode=False) -> dict:
+    ''' Wrapper for supplier search, allow use of cached data (limited daily API calls) '''
+    part_info = {}
+    # Check part number exist
+    if not part_number:
+        cprint('\n[MAIN]\tError: Missing Part Number', silent=settings.SILENT)
+        return part_info
+
+    store = get_supplier_store(supplier)
 
-    search_filename = f"{settings.search_results['directory']}{supplier}{store}_{part_number}{settings.search_results['extension']}"
     # Get cached data, if cache is enabled (else returns None)
-    part_cache = search_api.load_from_file(search_filename, test_mode)
+    part_cache = search_api.load_from_cache(supplier, part_number, store, test_mode)
+    stale = False
+    if not part_cache and settings.CACHE_STALE_WHILE_REVALIDATE and not test_mode:
+        # Use expired data while it is refreshed in the background
+        part_cache = search_api.load_from_cache(supplier, part_number, store, stale=True)
+        stale = bool(part_cache)
+    # Skip parts which recently failed, including refresh of stale data (always search in test mode)
+    failure = None
+    if (not part_cache or stale) and not test_mode:
+        failure = search_api.load_failure(supplier, part_number, store)
 
     if part_cache:
         cprint(f'\n[MAIN]\tUsing {supplier} cached data for {part_number}', silent=settings.SILENT)
         part_info = part_cache
+        if stale and not failure:
+            search_api.refresh_in_background(supplier_fetch, supplier, part_number, store)
+    elif failure:
+        cprint(f'\n[MAIN]\tSkipping {supplier} search for {part_number} (recently failed: {failure})', silent=settings.SILENT)
     else:
         cprint(f'\n[MAIN]\t{supplier} search for {part_number}', silent=settings.SILENT)
-        if supplier == 'Digi-Key':
-            part_info = digikey_api.fetch_part_info(part_number)
-        elif supplier == 'Mouser':
-            part_info = mouser_api.fetch_part_info(part_number)
-        elif supplier in ['Farnell', 'Newark', 'Element14']:
-            part_info = element14_api.fetch_part_info(part_number, supplier)
-        elif supplier == 'LCSC':
-            part_info = lcsc_api.fetch_part_info(part_number)
-        elif supplier == 'Jameco':
-            part_info = jameco_api.fetch_part_info(part_number)
-        elif supplier == 'TME':
-            part_info = tme_api.fetch_part_info(part_number)
-        elif supplier == 'AutomationDirect':
-            part_info = automationdirect_api.fetch_part_info(part_number)
+        part_info = supplier_fetch(supplier, part_number, store, test_mode)
 
     # Check supplier data exist
     if not part_info:
         cprint(f'[INFO]\tError: Failed to fetch data for "{part_number}"', silent=settings.SILENT)
 
-    # Save search results
-    if part_info:
-        update_ts = not bool(part_cache) or test_mode
-        search_api.save_to_file(part_info, search_filename, update_ts=update_ts)
+    # Save search results (cached data is only refreshed in test mode)
+    if part_info and (not part_cache or test_mode):
+        search_api.save_to_cache(part_info, supplier, part_number, store)
 
     return part_info
 
 
+def rank_search_result(part_number: str, part_form: dict) -> tuple:
+    ''' Ranking key of supplier search result (best match first) '''
+    part_number = part_number.lower()
+    manufacturer_part_number = str(part_form.get('manufacturer_part_number', '')).lower()
+    supplier_part_number = str(part_form.get('supplier_part_number', '')).lower()
+
+    if manufacturer_part_number == part_number:
+        match = 0
+    elif supplier_part_number == part_number:
+        match = 1
+    elif part_number in manufacturer_part_number or manufacturer_part_number in part_number:
+        match = 2
+    else:
+        match = 3
+
+    # Prefer most complete data
+    missing = len([value for value in part_form.values() if not value])
+    return match, missing
+
+
+def supplier_search_all(part_number: str, supplier_names=None, timeout=None, callback=None, test_mode=False) -> list:
+    ''' Search all enabled suppliers concurrently
+
+    Each supplier search is limited to timeout seconds (SUPPLIER_SEARCH_TIMEOUT by default),
+    callback(supplier, part_info) is called as each supplier answers.
+    Returns list of results (supplier, part_info and part_form) ranked by best match.
+    '''
+    from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError
+
+    results = []
+    if not part_number:
+        cprint('\n[MAIN]\tError: Missing Part Number', silent=settings.SILENT)
+        return results
+
+    if supplier_names is None:
+        supplier_names = [get_supplier_name(supplier) for supplier in settings.SUPPORTED_SUPPLIERS_API]
+    if timeout is None:
+        timeout = settings.SUPPLIER_SEARCH_TIMEOUT
+
+    # One thread per supplier
+    executor = ThreadPoolExecutor(max_workers=max(len(supplier_names), 1), thread_name_prefix='supplier_search')
+    searches = {
+        executor.submit(supplier_search, supplier, part_number, test_mode): supplier
+        for supplier in supplier_names
+    }
+    try:
+        for search in as_completed(searches, timeout=timeout):
+            supplier = searches[search]
+            try:
+                part_info = search.result()
+            except Exception as e:
+                cprint(f'[INFO]\tWarning: {supplier} search failed ({repr(e)})', silent=settings.SILENT)
+                part_info = {}
+
+            if callback:
+                callback(supplier, part_info)
+            if part_info:
+                results.append({
+                    'supplier': supplier,
+                    'part_info': part_info,
+                    'part_form': translate_supplier_to_form(supplier=supplier, part_info=part_info),
+                })
+    except TimeoutError:
+        for search, supplier in searches.items():
+            if not search.done():
+                cprint(f'[INFO]\tWarning: {supplier} search timed out ({timeout}s)', silent=settings.SILENT)
+                if callback:
+                    callback(supplier, {})
+    finally:
+        # Do not wait for timed out searches
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    # Keep supplier order for results with same rank
+    results.sort(key=lambda result: (rank_search_result(part_number, result['part_form']),
+                                     supplier_names.index(result['supplier'])))
+    return results
+
+
 def inventree_fuzzy_company_match(name: str) -> str:
     ''' Fuzzy match company name to exisiting companies '''
     from thefuzz import fuzz
@@ -789,8 +934,9 @@ def inventree_process_parameters(part_id: str, parameters: dict, show_progress=T
         [],  # Store updated parameters
         [],  # Store unchanged parameters
     ]
-    for name, value in parameters.items():
-        parameter, is_new_parameter, was_updated = inventree_api.create_parameter(part_id=part_id, template_name=name, value=value)
+    # Part parameters are fetched once, requests are sent concurrently
+    for name, result in inventree_api.upsert_parameters(part_id=part_id, parameters=parameters):
+        parameter, is_new_parameter, was_updated = result
         # Progress Update
         if not progress.update_progress_bar(show_progress, increment=0.03):
             return False
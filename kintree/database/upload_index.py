@@ -0,0 +1,114 @@
+import os
+import re
+import sqlite3
+import threading
+
+from ..config import settings
+
+# Uploaded file kinds
+IMAGE = 'image'
+ATTACHMENT = 'attachment'
+# Content hash is kept in image file names and attachment comments
+HASH_PATTERN = re.compile(r'(?<![0-9a-f])([0-9a-f]{64})(?![0-9a-f])')
+
+_connection = None
+_connection_path = None
+_lock = threading.Lock()
+
+
+def open_database() -> sqlite3.Connection:
+    ''' Open index of files uploaded to InvenTree servers '''
+    global _connection
+    global _connection_path
+
+    database = settings.UPLOADS_DATABASE
+
+    # Re-use connection unless cache path was changed
+    if _connection is not None and _connection_path == database:
+        return _connection
+
+    if not os.path.exists(os.path.dirname(database)):
+        os.makedirs(os.path.dirname(database), exist_ok=True)
+
+    connection = sqlite3.connect(database, check_same_thread=False, isolation_level=None, timeout=10)
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('''
+        CREATE TABLE IF NOT EXISTS uploads (
+            server TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            sha256 TEXT NOT NULL,
+            file TEXT NOT NULL,
+            PRIMARY KEY (server, kind, sha256)
+        )
+    ''')
+
+    if _connection is not None:
+        _connection.close()
+    _connection = connection
+    _connection_path = database
+
+    return _connection
+
+
+def get_hash(text: str) -> str:
+    ''' Find content hash in file name or comment (None if missing) '''
+    match = HASH_PATTERN.search(text or '')
+    if match:
+        return match.group(1)
+    return None
+
+
+def load(server: str, kind: str, sha256: str) -> str:
+    ''' Get uploaded file with same content (None if not uploaded yet) '''
+    with _lock:
+        row = open_database().execute(
+            'SELECT file FROM uploads WHERE server = ? AND kind = ? AND sha256 = ?',
+            (server, kind, sha256),
+        ).fetchone()
+
+    if row:
+        return row[0]
+    return None
+
+
+def save(server: str, kind: str, sha256: str, file: str):
+    ''' Record uploaded file '''
+    with _lock:
+        open_database().execute(
+            'INSERT OR REPLACE INTO uploads (server, kind, sha256, file) VALUES (?, ?, ?, ?)',
+            (server, kind, sha256, file),
+        )
+
+
+def remove(server: str, kind: str, sha256: str):
+    ''' Forget uploaded file (eg. deleted from server) '''
+    with _lock:
+        open_database().execute(
+            'DELETE FROM uploads WHERE server = ? AND kind = ? AND sha256 = ?',
+            (server, kind, sha256),
+        )
+
+
+def count(server: str) -> int:
+    ''' Get number of files recorded for server '''
+    with _lock:
+        return open_database().execute('SELECT COUNT(*) FROM uploads WHERE server = ?', (server,)).fetchone()[0]
+
+
+def rebuild(server: str, entries: list) -> int:
+    ''' Replace index of server with (kind, sha256, file) entries '''
+    with _lock:
+        connection = open_database()
+        connection.execute('BEGIN')
+        try:
+            connection.execute('DELETE FROM uploads WHERE server = ?', (server,))
+            connection.executemany(
+                'INSERT OR REPLACE INTO uploads (server, kind, sha256, file) VALUES (?, ?, ?, ?)',
+                [(server, kind, sha256, file) for kind, sha256, file in entries],
+            )
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+
+    return len(entries)
@@ -1,5 +1,6 @@
 import os
 import copy
+import threading
 import flet as ft
 
 # Version
@@ -11,7 +12,7 @@ from .common import CommonView
 from .common import DropdownWithSearch, SwitchWithRefs
 from .common import handle_transition
 # Tools
-from ...common.tools import cprint, download_with_retry
+from ...common.tools import cprint
 # Settings
 from ...common import progress
 from ...config import settings, config_interface
@@ -20,7 +21,7 @@ from ...database import inventree_interface
 # KiCad
 from ...kicad import kicad_interface
 # SnapEDA
-from ...search import snapeda_api
+from ...search import snapeda_api, rate_limiter, download_cache
 
 # Main AppBar
 main_appbar = ft.AppBar(
@@ -246,6 +247,11 @@ class PartSearchView(MainView):
 
     title = 'Part Search'
 
+    # Supplier option to search all enabled suppliers
+    all_suppliers = 'All Suppliers'
+    # Supplier answers are listed from search threads
+    supplier_results_lock = threading.Lock()
+
     # List of search fields
     search_fields_list = [
         'name',
@@ -286,6 +292,13 @@ class PartSearchView(MainView):
             label='View Parameters',
             disabled=True
         ),
+        'quota': ft.Text(
+            size=12,
+        ),
+        'supplier_results': ft.Row(
+            wrap=True,
+            spacing=20,
+        ),
         'search_form': {},
         'parameter_form': {},
     }
@@ -296,6 +309,8 @@ class PartSearchView(MainView):
             'custom_part': None,
         }
         self.fields['parameter_form'] = {}
+        with self.supplier_results_lock:
+            self.fields['supplier_results'].controls = []
         try:
             self.fields['part_number'].focus()
         except AssertionError:
@@ -334,13 +349,26 @@ class PartSearchView(MainView):
             else:
                 self.data['custom_part'] = False
 
-                # Get supplier
-                supplier = inventree_interface.get_supplier_name(self.fields['supplier'].value)
-                # Supplier search
-                part_supplier_info = inventree_interface.supplier_search(
-                    supplier,
-                    self.fields['part_number'].value
-                )
+                if self.fields['supplier'].value == self.all_suppliers:
+                    # Search all suppliers, use best match
+                    search_results = inventree_interface.supplier_search_all(
+                        self.fields['part_number'].value,
+                        callback=self.show_supplier_result,
+                    )
+                    supplier = None
+                    part_supplier_info = {}
+                    if search_results:
+                        supplier = search_results[0]['supplier']
+                        part_supplier_info = search_results[0]['part_info']
+                        self.show_supplier_result(supplier, part_supplier_info, best_match=True)
+                else:
+                    # Get supplier
+                    supplier = inventree_interface.get_supplier_name(self.fields['supplier'].value)
+                    # Supplier search
+                    part_supplier_info = inventree_interface.supplier_search(
+                        supplier,
+                        self.fields['part_number'].value
+                    )
 
                 part_supplier_form = None
 
@@ -377,6 +405,7 @@ class PartSearchView(MainView):
 
             # Add to data buffer
             self.push_data()
+            self.update_quota()
             self._page.splash.visible = False
 
             if not self.data['supplier_part_number'] and not self.data['custom_part']:
@@ -397,6 +426,38 @@ class PartSearchView(MainView):
             self._page.update()
         return
 
+    def show_supplier_result(self, supplier: str, part_info: dict, best_match=False):
+        # List each supplier answer as it comes in (called from search thread)
+        results = self.fields['supplier_results']
+        result = ft.Row(
+            controls=[
+                ft.Icon(
+                    name=ft.icons.CHECK_CIRCLE if part_info else ft.icons.CANCEL,
+                    color='green' if part_info else 'red',
+                    size=16,
+                ),
+                ft.Text(
+                    f'{supplier} (best match)' if best_match else supplier,
+                    size=12,
+                    weight=ft.FontWeight.BOLD if best_match else None,
+                ),
+            ],
+            spacing=4,
+            data=supplier,
+        )
+        with self.supplier_results_lock:
+            # Replace previous answer of same supplier
+            results.controls = [control for control in results.controls if control.data != supplier]
+            if best_match:
+                results.controls.insert(0, result)
+            else:
+                results.controls.append(result)
+            try:
+                results.update()
+            except AssertionError:
+                # Control not added to page yet
+                pass
+
     def push_data(self, e=None):
         hidden_fields = {
             'searched_part_number': self.fields['part_number'].value,
@@ -417,6 +478,8 @@ class PartSearchView(MainView):
         self.fields['supplier'].options = [
             ft.dropdown.Option(supplier) for supplier in settings.SUPPORTED_SUPPLIERS_API
         ]
+        if len(self.fields['supplier'].options) > 1:
+            self.fields['supplier'].options.append(ft.dropdown.Option(self.all_suppliers))
         if len(self.fields['supplier'].options) == 1:
             self.fields['supplier'].value = self.fields['supplier'].options[0].key
         else:
@@ -426,6 +489,23 @@ class PartSearchView(MainView):
         except AssertionError:
             # Control not added to page yet
             pass
+        self.update_quota()
+
+    def update_quota(self, e=None):
+        # Show remaining daily API requests for selected supplier
+        remaining = None
+        if self.fields['supplier'].value and self.fields['supplier'].value != self.all_suppliers:
+            supplier = inventree_interface.get_supplier_name(self.fields['supplier'].value)
+            remaining = rate_limiter.get_remaining_quota(supplier)
+        if remaining is None:
+            self.fields['quota'].value = ''
+        else:
+            self.fields['quota'].value = f'{remaining} requests left today'
+        try:
+            self.fields['quota'].update()
+        except AssertionError:
+            # Control not added to page yet
+            pass
 
     def switch_view(self, e=None):
         # show parameters instead of part information
@@ -438,8 +518,10 @@ class PartSearchView(MainView):
                     self.fields['supplier'],
                     self.fields['search_button'],
                     self.fields['parameter_view'],
+                    self.fields['quota'],
                 ],
             ),
+            self.fields['supplier_results'],
             ft.Divider(),
         ]
         if not parameters_view:
@@ -463,6 +545,7 @@ class PartSearchView(MainView):
         self.fields['search_button'].on_click = self.run_search
         self.fields['parameter_view'].on_change = self.switch_view
         self.fields['part_number'].on_submit = self.perform_pn_search
+        self.fields['supplier'].on_change = self.update_quota
 
         self.column = ft.Column(
             controls=[
@@ -476,8 +559,10 @@ class PartSearchView(MainView):
                                     self.fields['supplier'],
                                     self.fields['search_button'],
                                     self.fields['parameter_view'],
+                                    self.fields['quota'],
                                 ],
                             ),
+                            self.fields['supplier_results'],
                             ft.Divider(),
                         ],
                         scroll=ft.ScrollMode.HIDDEN,
@@ -1571,7 +1656,7 @@ class CreateView(MainView):
                 datasheet_url = part_info.get('datasheet', None)
                 if datasheet_url:
                     cprint('\n[MAIN]\tDownloading Datasheet')
-                    if download_with_retry(datasheet_url, filename, filetype='PDF', timeout=10):
+                    if download_cache.download_file(datasheet_url, filename, filetype='PDF', timeout=10):
                         cprint(f'[INFO]\tSuccess: Datasheet saved to {filename}')
         # Open browser
         if settings.ENABLE_INVENTREE:
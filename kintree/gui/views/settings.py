@@ -688,6 +688,9 @@ class SupplierSettingsView(SettingsView):
         config_interface.dump_file(supplier_settings, self.settings_file)
         # Update suppliers
         global_settings.load_suppliers()
+        # Retry failed searches with new settings
+        from ...search import search_api
+        search_api.clear_failures()
         
         # API settings
         if supplier == 'Digi-Key':
@@ -780,28 +783,8 @@ class SupplierSettingsView(SettingsView):
         '''Test supplier API settings'''
         self.save_s(e, supplier, show_dialog=False)
 
-        result = False
-        if supplier == 'Digi-Key':
-            from ...search import digikey_api
-            result = digikey_api.test_api()
-        elif supplier == 'Mouser':
-            from ...search import mouser_api
-            result = mouser_api.test_api()
-        elif supplier == 'Element14' or supplier == 'Farnell' or supplier == 'Newark':
-            from ...search import element14_api
-            result = element14_api.test_api()
-        elif supplier == 'LCSC':
-            from ...search import lcsc_api
-            result = lcsc_api.test_api()
-        elif supplier == 'TME':
-            from ...search import tme_api
-            result = tme_api.test_api()
-        elif supplier == 'Jameco':
-            from ...search import jameco_api
-            result = jameco_api.test_api()
-        elif supplier == 'AutomationDirect':
-            from ...search import automationdirect_api
-            result = automationdirect_api.test_api()
+        from ...search import suppliers
+        result = suppliers.test_api(supplier)
 
         if result:
             self.show_dialog(
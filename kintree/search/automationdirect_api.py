@@ -1,4 +1,5 @@
 from ..common.tools import download
+from . import rate_limiter
 
 # These are the 'keys' we want to pull out response
 SEARCH_HEADERS = [
@@ -72,6 +73,8 @@ def fetch_part_info(part_number: str, silent=False) -> dict:
 
     def search_timeout(timeout=10):
         url = automationdirect_api_settings.get('AUTOMATIONDIRECT_API_URL', '') + automationdirect_api_settings.get('AUTOMATIONDIRECT_API_SEARCH_QUERY', '') + part_number + automationdirect_api_settings.get('AUTOMATIONDIRECT_API_SEARCH_STRING', '') + part_number
+        if not rate_limiter.acquire('AutomationDirect'):
+            return None
         response = download(url, timeout=timeout)
         return response
 
@@ -0,0 +1,119 @@
+import os
+import threading
+import time
+
+from ..config import settings
+from ..common.tools import cprint
+
+# Minimum delay between two sweeps triggered by cache writes (seconds)
+SWEEP_MIN_DELAY = 60
+
+_sweeper = None
+_sweeper_lock = threading.Lock()
+_wake_up = threading.Event()
+_last_sweep = 0
+
+
+def touch(file_path: str):
+    ''' Record access to cached file (used for least recently used eviction) '''
+    try:
+        os.utime(file_path)
+    except OSError:
+        pass
+
+
+def sweep_directory(directory: str, max_age=0, max_size=0, max_entries=0) -> tuple:
+    ''' Remove expired files, then least recently used files until directory fits in size limits '''
+    files = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_file(follow_symlinks=False):
+                    stat = entry.stat(follow_symlinks=False)
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+    except FileNotFoundError:
+        return 0, 0
+
+    # Least recently used first
+    files.sort()
+
+    now = time.time()
+    size = sum([file[1] for file in files])
+    count = len(files)
+    removed = 0
+    for last_access, file_size, file_path in files:
+        expired = max_age and now - last_access > max_age
+        too_many = max_entries and count > max_entries
+        too_large = max_size and size > max_size
+        if not (expired or too_many or too_large):
+            break
+
+        try:
+            os.remove(file_path)
+        except OSError:
+            continue
+        size -= file_size
+        count -= 1
+        removed += 1
+
+    return removed, count
+
+
+def sweep(silent=True) -> dict:
+    ''' Sweep all cache directories '''
+    global _last_sweep
+    from . import search_api
+
+    _last_sweep = time.time()
+    results = {}
+
+    # Search results
+    if settings.CACHE_ENABLED:
+        # Cached results are used regardless of their age in test mode
+        max_age = 0 if settings.ENABLE_TEST else settings.CACHE_VALID_DAYS * 24 * 3600
+        if max_age and settings.CACHE_STALE_WHILE_REVALIDATE:
+            # Keep expired data which can still be served
+            max_age = max(max_age, settings.CACHE_STALE_VALID_DAYS * 24 * 3600)
+        results['search'] = search_api.sweep_cache(max_age=max_age, **settings.CACHE_LIMITS['search'])
+
+    # Images and datasheets (shared downloads are linked to part files)
+    max_age = settings.CACHE_FILES_VALID_DAYS * 24 * 3600
+    results['images'] = sweep_directory(settings.search_images, max_age=max_age, **settings.CACHE_LIMITS['images'])
+    results['datasheets'] = sweep_directory(settings.search_datasheets, max_age=max_age, **settings.CACHE_LIMITS['datasheets'])
+    results['downloads'] = sweep_directory(settings.search_downloads, max_age=max_age, **settings.CACHE_LIMITS['downloads'])
+
+    for cache_name, (removed, remaining) in results.items():
+        if removed:
+            cprint(f'[INFO]\tCache sweep: removed {removed} {cache_name} entries ({remaining} remaining)', silent=silent)
+
+    return results
+
+
+def run_sweeper():
+    ''' Background sweep loop '''
+    while True:
+        try:
+            sweep(silent=settings.HIDE_DEBUG)
+        except Exception as e:
+            cprint(f'[INFO]\tWarning: Cache sweep failed ({repr(e)})', silent=settings.HIDE_DEBUG)
+
+        _wake_up.wait(timeout=settings.CACHE_SWEEP_INTERVAL_HOURS * 3600)
+        _wake_up.clear()
+        # Limit sweeps triggered by cache writes
+        time.sleep(max(0, SWEEP_MIN_DELAY - (time.time() - _last_sweep)))
+
+
+def start_sweeper():
+    ''' Start background sweep of cache directories (once per process) '''
+    global _sweeper
+
+    with _sweeper_lock:
+        if _sweeper is not None and _sweeper.is_alive():
+            return
+        _sweeper = threading.Thread(target=run_sweeper, name='cache_sweeper', daemon=True)
+        _sweeper.start()
+
+
+def notify_write():
+    ''' Notify background sweeper that new data was written to the cache '''
+    _wake_up.set()
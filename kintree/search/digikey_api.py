@@ -1,8 +1,15 @@
 import logging
 import os
 import digikey
+import urllib3
 
+from ..common.http_client import CONNECT_TIMEOUT
+from ..common.tools import set_request_error, REQUEST_TIMEOUT, REQUEST_HTTP_ERROR
 from ..config import settings, config_interface
+from . import rate_limiter
+
+# Maximum time to wait for API response (seconds)
+SEARCH_TIMEOUT = 20
 
 SEARCH_HEADERS = [
     'description',
@@ -28,11 +35,6 @@ PRICING_MAP = [
     'package_type'
 ]
 
-os.environ['DIGIKEY_STORAGE_PATH'] = settings.DIGIKEY_STORAGE_PATH
-# Check if storage path exists, else create it
-if not os.path.exists(os.environ['DIGIKEY_STORAGE_PATH']):
-    os.makedirs(os.environ['DIGIKEY_STORAGE_PATH'], exist_ok=True)
-
 
 def disable_api_logger():
     # Digi-Key API logger
@@ -52,6 +54,12 @@ def check_environment() -> bool:
 
 
 def setup_environment(force=False) -> bool:
+    # API token storage
+    os.environ['DIGIKEY_STORAGE_PATH'] = settings.DIGIKEY_STORAGE_PATH
+    # Check if storage path exists, else create it
+    if not os.path.exists(os.environ['DIGIKEY_STORAGE_PATH']):
+        os.makedirs(os.environ['DIGIKEY_STORAGE_PATH'], exist_ok=True)
+
     if not check_environment() or force:
         # SETUP the Digikey authentication see https://developer.digikey.com/documentation/organization#production
         digikey_api_settings = config_interface.load_file(settings.CONFIG_DIGIKEY_API)
@@ -92,7 +100,6 @@ def find_categories(part_details: str):
 
 def fetch_part_info(part_number: str) -> dict:
     ''' Fetch part data from API '''
-    from wrapt_timeout_decorator import timeout
 
     part_info = {}
     if not setup_environment():
@@ -102,13 +109,13 @@ def fetch_part_info(part_number: str) -> dict:
 
     # THIS METHOD CAN SOMETIMES RETURN INCORRECT MATCH
     # Added logic to check the result in the GUI flow
-    @timeout(dec_timeout=20)
     def digikey_search_timeout():
         return digikey.product_details(
             part_number,
             x_digikey_locale_site=os.environ['DIGIKEY_LOCAL_SITE'],
             x_digikey_locale_language=os.environ['DIGIKEY_LOCAL_LANGUAGE'],
             x_digikey_locale_currency=os.environ['DIGIKEY_LOCAL_CURRENCY'],
+            _request_timeout=(CONNECT_TIMEOUT, SEARCH_TIMEOUT),
         ).to_dict()
 
     # Method to process price breaks
@@ -120,9 +127,20 @@ def fetch_part_info(part_number: str) -> dict:
             part_info['pricing'][quantity] = price
 
     # Query part number
+    if not rate_limiter.acquire('Digi-Key'):
+        return part_info
     try:
         part = digikey_search_timeout()
-    except:
+    except (urllib3.exceptions.TimeoutError, urllib3.exceptions.MaxRetryError) as e:
+        if isinstance(getattr(e, 'reason', e), urllib3.exceptions.TimeoutError):
+            set_request_error(REQUEST_TIMEOUT)
+        else:
+            set_request_error(REQUEST_HTTP_ERROR)
+        part = None
+    except Exception as e:
+        # Unknown part numbers return 404
+        if getattr(e, 'status', 404) != 404:
+            set_request_error(REQUEST_HTTP_ERROR)
         part = None
 
     if not part:
@@ -0,0 +1,324 @@
+import hashlib
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+
+from ..config import settings
+from ..common import download_stats, http_client
+from ..common.tools import cprint, download_with_retry, get_response_validators, save_response, DOWNLOAD_STRATEGIES
+from . import cache_manager
+
+# Downloaded files index
+SCHEMA_VERSION = 1
+# Size of chunks read to hash files (bytes)
+HASH_CHUNK_SIZE = 1024 * 1024
+# Maximum duration of conditional requests (seconds)
+REFRESH_TIMEOUT = 10
+
+_connection = None
+_connection_path = None
+_lock = threading.Lock()
+
+
+def open_database() -> sqlite3.Connection:
+    ''' Open downloaded files index (shared by all processes) '''
+    global _connection
+    global _connection_path
+
+    database = settings.DOWNLOADS_DATABASE
+
+    # Re-use connection unless cache path was changed
+    if _connection is not None and _connection_path == database:
+        return _connection
+
+    if not os.path.exists(os.path.dirname(database)):
+        os.makedirs(os.path.dirname(database), exist_ok=True)
+
+    connection = sqlite3.connect(database, check_same_thread=False, isolation_level=None, timeout=10)
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('''
+        CREATE TABLE IF NOT EXISTS downloads (
+            url TEXT PRIMARY KEY,
+            file TEXT NOT NULL,
+            sha256 TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            timestamp INTEGER NOT NULL
+        )
+    ''')
+    upgrade_schema(connection)
+
+    if _connection is not None:
+        _connection.close()
+    _connection = connection
+    _connection_path = database
+
+    return _connection
+
+
+def upgrade_schema(connection: sqlite3.Connection):
+    ''' Upgrade downloaded files index schema to latest version '''
+    version = connection.execute('PRAGMA user_version').fetchone()[0]
+
+    if version < 1:
+        # Validators used for conditional requests
+        connection.execute("ALTER TABLE downloads ADD COLUMN filetype TEXT NOT NULL DEFAULT ''")
+        connection.execute("ALTER TABLE downloads ADD COLUMN etag TEXT NOT NULL DEFAULT ''")
+        connection.execute("ALTER TABLE downloads ADD COLUMN last_modified TEXT NOT NULL DEFAULT ''")
+        # Local files linked to downloaded files
+        connection.execute('''
+            CREATE TABLE IF NOT EXISTS links (
+                path TEXT PRIMARY KEY,
+                url TEXT NOT NULL
+            )
+        ''')
+
+    connection.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+
+def normalize_url(url: str) -> str:
+    ''' Normalize URL used as cache key (case of scheme and host, default port, query order, fragment) '''
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if port and (scheme, port) not in [('http', 80), ('https', 443)]:
+        host = f'{host}:{port}'
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+
+    return urlunsplit((scheme, host, parts.path or '/', query, ''))
+
+
+def hash_file(file_path: str) -> str:
+    ''' Get SHA-256 hash of file content '''
+    sha256 = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def load(url: str) -> dict:
+    ''' Get cached file entry of URL (None if not cached) '''
+    key = normalize_url(url)
+
+    with _lock:
+        connection = open_database()
+        row = connection.execute(
+            'SELECT file, timestamp, filetype, etag, last_modified FROM downloads WHERE url = ?',
+            (key,),
+        ).fetchone()
+        if not row:
+            return None
+
+        file, timestamp, filetype, etag, last_modified = row
+        file_path = os.path.join(settings.search_downloads, file)
+        if not os.path.isfile(file_path):
+            # Removed by cache sweep
+            connection.execute('DELETE FROM downloads WHERE url = ?', (key,))
+            return None
+
+    return {
+        'path': file_path,
+        'timestamp': timestamp,
+        # Entries saved before file type was recorded
+        'filetype': filetype or ('PDF' if file.endswith('.pdf') else 'Image'),
+        'etag': etag,
+        'last_modified': last_modified,
+    }
+
+
+def is_expired(url: str) -> bool:
+    ''' Check if URL was downloaded and needs to be revalidated '''
+    entry = load(url)
+    if not entry:
+        return False
+    return int(time.time()) - entry['timestamp'] >= settings.CACHE_FILES_VALID_DAYS * 24 * 3600
+
+
+def save(url: str, file_path: str, extension: str, filetype: str, validators: dict) -> str:
+    ''' Move downloaded file into cache (named after content hash), returns cached file path '''
+    sha256 = hash_file(file_path)
+    file = f'{sha256}{extension}'
+    cached_file = os.path.join(settings.search_downloads, file)
+
+    if os.path.isfile(cached_file):
+        # Same content downloaded from another URL
+        os.remove(file_path)
+    else:
+        os.replace(file_path, cached_file)
+
+    with _lock:
+        open_database().execute(
+            'INSERT OR REPLACE INTO downloads (url, file, sha256, size, timestamp, filetype, etag, last_modified) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (normalize_url(url), file, sha256, os.path.getsize(cached_file), int(time.time()),
+             filetype, validators.get('etag', ''), validators.get('last_modified', '')),
+        )
+    cache_manager.notify_write()
+
+    return cached_file
+
+
+def get_temporary_file(url: str) -> str:
+    ''' Get temporary download path of URL (interrupted download is resumed on next attempt) '''
+    if not os.path.exists(settings.search_downloads):
+        os.makedirs(settings.search_downloads, exist_ok=True)
+    url_hash = hashlib.sha1(normalize_url(url).encode()).hexdigest()
+    return os.path.join(settings.search_downloads, f'{url_hash}.download')
+
+
+def revalidate(url: str, entry: dict, timeout=REFRESH_TIMEOUT, silent=False) -> tuple:
+    ''' Conditional request for cached file, returns (cached file path, content was modified) '''
+    from cloudscraper.exceptions import CloudflareException
+
+    headers = {}
+    if entry['etag']:
+        headers['If-None-Match'] = entry['etag']
+    if entry['last_modified']:
+        headers['If-Modified-Since'] = entry['last_modified']
+    if not headers:
+        # Server did not send validators
+        return None, False
+
+    # Use strategy which last succeeded for this host
+    strategy = download_stats.get_strategies(url, list(DOWNLOAD_STRATEGIES.keys()))[0]
+    try:
+        if strategy == 'cloudscraper':
+            headers.update(http_client.BROWSER_HEADERS)
+            response = http_client.get_scraper(url).get(url, headers=headers, timeout=timeout, stream=True)
+        else:
+            response = http_client.get(url, timeout=timeout, browser_headers=strategy == 'headers', headers=headers, stream=True)
+
+        if response.status_code == 304:
+            response.close()
+            with _lock:
+                open_database().execute(
+                    'UPDATE downloads SET timestamp = ? WHERE url = ?',
+                    (int(time.time()), normalize_url(url)),
+                )
+            return entry['path'], False
+
+        response.raise_for_status()
+    except (requests.exceptions.RequestException, CloudflareException) as e:
+        cprint(f'[INFO]\tWarning: Could not check {entry["filetype"]} for updates ({url}): {e}', silent=silent)
+        return None, False
+
+    # Content was modified
+    temporary_file = get_temporary_file(url)
+    if os.path.isfile(temporary_file + '.part'):
+        os.remove(temporary_file + '.part')
+    if not save_response(response, temporary_file, entry['filetype'], silent=silent):
+        return None, False
+    validators = {
+        'etag': response.headers.get('ETag', ''),
+        'last_modified': response.headers.get('Last-Modified', ''),
+    }
+    return save(url, temporary_file, os.path.splitext(entry['path'])[1], entry['filetype'], validators), True
+
+
+def link(cached_file: str, full_path: str, url=None):
+    ''' Hard link cached file to full path (copy if file system does not support it) '''
+    if os.path.abspath(cached_file) == os.path.abspath(full_path):
+        return
+    if os.path.lexists(full_path):
+        os.remove(full_path)
+    try:
+        os.link(cached_file, full_path)
+    except OSError:
+        shutil.copyfile(cached_file, full_path)
+
+    if url:
+        # Updated when file is refreshed
+        with _lock:
+            open_database().execute(
+                'INSERT OR REPLACE INTO links (path, url) VALUES (?, ?)',
+                (os.path.abspath(full_path), normalize_url(url)),
+            )
+
+
+def download_file(url: str, full_path: str, filetype='Image', silent=False, refresh=False, **kwargs) -> bool:
+    ''' Download URL to local file, files are only downloaded once for all parts sharing the same URL '''
+    if not url:
+        cprint('[INFO]\tError: Missing image URL', silent=silent)
+        return False
+
+    cached_file = None
+    entry = load(url)
+    if entry and (refresh or is_expired(url)):
+        # Check if file was modified (conditional request)
+        cached_file, modified = revalidate(url, entry, timeout=kwargs.get('timeout', REFRESH_TIMEOUT), silent=silent)
+        if cached_file and not modified:
+            cprint(f'[INFO]\tCached {filetype} not modified ({url})', silent=silent)
+        elif not cached_file and (entry['etag'] or entry['last_modified']) and os.path.isfile(entry['path']):
+            # Server could not be checked (eg. offline), expired file is better than no file
+            cached_file = entry['path']
+            cprint(f'[INFO]\tWarning: Using expired cached {filetype} ({url})', silent=silent)
+    elif entry:
+        cached_file = entry['path']
+        cprint(f'[INFO]\tUsing cached {filetype} ({url})', silent=silent)
+
+    if cached_file:
+        # Track access
+        cache_manager.touch(cached_file)
+    else:
+        temporary_file = get_temporary_file(url)
+        if download_with_retry(url, temporary_file, filetype=filetype, silent=silent, **kwargs):
+            cached_file = save(url, temporary_file, os.path.splitext(full_path)[1], filetype, get_response_validators())
+        elif entry and os.path.isfile(entry['path']):
+            # Server did not send validators and could not be reached
+            cached_file = entry['path']
+            cprint(f'[INFO]\tWarning: Using expired cached {filetype} ({url})', silent=silent)
+        else:
+            return False
+
+    try:
+        link(cached_file, full_path, url)
+    except OSError:
+        cprint(f'[INFO]\tWarning: Failed to save {filetype} to {full_path}', silent=silent)
+        return False
+
+    return True
+
+
+def refresh_all(silent=False) -> dict:
+    ''' Check all downloaded files for updates, update local files linked to modified files '''
+    with _lock:
+        urls = [row[0] for row in open_database().execute('SELECT url FROM downloads').fetchall()]
+
+    results = {'not_modified': 0, 'modified': 0, 'failed': 0}
+    for url in urls:
+        entry = load(url)
+        if not entry:
+            continue
+        cached_file, modified = revalidate(url, entry, silent=silent)
+        if not cached_file:
+            results['failed'] += 1
+            continue
+        if not modified:
+            results['not_modified'] += 1
+            continue
+        results['modified'] += 1
+
+        # Update local files (eg. part datasheets)
+        with _lock:
+            paths = [row[0] for row in open_database().execute('SELECT path FROM links WHERE url = ?', (url,)).fetchall()]
+        for path in paths:
+            if os.path.isfile(path):
+                try:
+                    link(cached_file, path)
+                except OSError:
+                    cprint(f'[INFO]\tWarning: Failed to update {path}', silent=silent)
+
+    cprint(f'[INFO]\tChecked {len(urls)} downloaded files: {results["modified"]} modified, '
+           f'{results["not_modified"]} not modified', silent=silent)
+    if results['failed']:
+        cprint(f'[INFO]\tWarning: {results["failed"]} downloaded files could not be checked', silent=silent)
+    return results
@@ -1,5 +1,6 @@
 from ..config import settings, config_interface
 from ..common.tools import download
+from . import rate_limiter
 
 ELEMENT14_API_URL = 'https://api.element14.com/catalog/products'
 
@@ -59,6 +60,9 @@ STORES = {
     },
 }
 
+# Maximum number of order codes per API request
+ORDER_CODES_MAX = 20
+
 SEARCH_HEADERS = [
     'brandName',
     'displayName',
@@ -161,8 +165,8 @@ def get_default_store_url(supplier: str) -> str:
     return STORES[supplier][default_store]
 
 
-def build_api_url(part_number: str, supplier: str, store_url=None, silent=False) -> str:
-    ''' Build API URL based on user settings '''
+def build_api_url(part_number: str, supplier: str, store_url=None, silent=False, search_term='manuPartNum', number_of_results=1) -> str:
+    ''' Build API URL based on user settings (order codes search term "id" accepts comma-separated part numbers) '''
 
     user_settings = config_interface.load_file(settings.CONFIG_ELEMENT14_API)
     api_key = user_settings.get('ELEMENT14_PRODUCT_SEARCH_API_KEY', '')
@@ -181,14 +185,14 @@ def build_api_url(part_number: str, supplier: str, store_url=None, silent=False)
     api_url = ELEMENT14_API_URL
     # Set response format
     api_url += '?callInfo.responseDataFormat=JSON'
-    # Set result settings: offset = 0; number of results = 1; size = large (eg. to get attributes)
-    api_url += '&resultsSettings.offset=0&resultsSettings.numberOfResults=1&resultsSettings.responseGroup=large'
+    # Set result settings: offset = 0; number of results = 1 per part; size = large (eg. to get attributes)
+    api_url += f'&resultsSettings.offset=0&resultsSettings.numberOfResults={number_of_results}&resultsSettings.responseGroup=large'
     # Set API key
     api_url += f'&callInfo.apiKey={api_key}'
     # Set store URL
     api_url += f'&storeInfo.id={store_url}'
     # Set part number
-    api_url += f'&term=manuPartNum:{part_number}'
+    api_url += f'&term={search_term}:{part_number}'
 
     return api_url
 
@@ -213,31 +217,10 @@ def build_image_url(image_data: dict, supplier: str, store_url=None) -> str:
     return image_url
 
 
-def fetch_part_info(part_number: str, supplier: str, store_url=None, silent=False) -> dict:
-    ''' Fetch part data from API '''
-
+def parse_part(part: dict, supplier: str, store_url=None) -> dict:
+    ''' Convert API product data to part info '''
     part_info = {}
 
-    def search_timeout(timeout=10):
-        url = build_api_url(part_number, supplier, store_url, silent)
-        response = download(url, timeout=timeout)
-        return response
-
-    # Query part number
-    try:
-        part = search_timeout()
-    except:
-        part = None
-
-    # Extract result
-    try:
-        part = part['manufacturerPartNumberSearchReturn'].get('products', [])[0]
-    except (TypeError, IndexError):
-        part = None
-
-    if not part:
-        return part_info
-
     headers = SEARCH_HEADERS
 
     for key in part:
@@ -311,6 +294,77 @@ def fetch_part_info(part_number: str, supplier: str, store_url=None, silent=Fals
     return part_info
 
 
+def fetch_part_info(part_number: str, supplier: str, store_url=None, silent=False) -> dict:
+    ''' Fetch part data from API '''
+
+    part_info = {}
+
+    def search_timeout(timeout=10):
+        url = build_api_url(part_number, supplier, store_url, silent)
+        if not rate_limiter.acquire(supplier):
+            return None
+        response = download(url, timeout=timeout)
+        return response
+
+    # Query part number
+    try:
+        part = search_timeout()
+    except:
+        part = None
+
+    # Extract result
+    try:
+        part = part['manufacturerPartNumberSearchReturn'].get('products', [])[0]
+    except (TypeError, IndexError):
+        part = None
+
+    if not part:
+        return part_info
+
+    return parse_part(part, supplier, store_url)
+
+
+def fetch_parts_info(part_numbers: list, supplier: str, store_url=None, silent=False, order_codes=False) -> dict:
+    ''' Fetch data of several parts from API, returns part data for each part number
+
+    Part numbers are manufacturer part numbers, which only support one part number per request.
+    Order codes (order_codes=True) are searched in batches.
+    '''
+    parts_info = {}
+
+    # Remove duplicates (keep order)
+    part_numbers = list(dict.fromkeys(part_numbers))
+
+    if not order_codes:
+        # Numeric manufacturer part numbers can match the order code of another product
+        for part_number in part_numbers:
+            parts_info[part_number] = fetch_part_info(part_number, supplier, store_url, silent)
+        return parts_info
+
+    for idx in range(0, len(part_numbers), ORDER_CODES_MAX):
+        chunk = part_numbers[idx:idx + ORDER_CODES_MAX]
+
+        # Query order codes
+        url = build_api_url(','.join(chunk), supplier, store_url, silent, search_term='id', number_of_results=len(chunk))
+        if not rate_limiter.acquire(supplier):
+            break
+        try:
+            products = download(url, timeout=10)['premierFarnellPartNumberReturn'].get('products', [])
+        except (TypeError, KeyError, AttributeError):
+            products = []
+
+        # Split response
+        for product in products or []:
+            if product.get('sku', None) in chunk:
+                parts_info[product['sku']] = parse_part(product, supplier, store_url)
+
+    # Order codes not found
+    for part_number in part_numbers:
+        parts_info.setdefault(part_number, {})
+
+    return parts_info
+
+
 def test_api(store_url=None) -> bool:
     ''' Test method for API '''
 
@@ -1,6 +1,7 @@
 import html
 import re
 from ..common.tools import download
+from . import rate_limiter
 
 SEARCH_HEADERS = [
     'title',
@@ -58,6 +59,8 @@ def fetch_part_info(part_number: str) -> dict:
 
     def search_timeout(timeout=10):
         url = jameco_api_settings.get('JAMECO_API_URL', '') + part_number
+        if not rate_limiter.acquire('Jameco'):
+            return None
         response = download(url, timeout=timeout)
         return response
 
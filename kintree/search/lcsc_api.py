@@ -1,4 +1,5 @@
 from ..common.tools import download
+from . import rate_limiter
 
 SEARCH_HEADERS = [
     'productDescEn',
@@ -56,6 +57,8 @@ def fetch_part_info(part_number: str) -> dict:
 
     def search_timeout(timeout=10):
         url = lcsc_api_settings.get('LCSC_API_URL', '') + part_number
+        if not rate_limiter.acquire('LCSC'):
+            return None
         response = download(url, timeout=timeout)
         return response
 
@@ -1,6 +1,12 @@
+import json
 import os
 
+import requests
+
+from ..common import http_client
+from ..common.tools import set_request_error, REQUEST_TIMEOUT, REQUEST_HTTP_ERROR
 from ..config import settings, config_interface
+from . import rate_limiter
 from mouser.api import MouserPartSearchRequest
 
 SEARCH_HEADERS = [
@@ -19,6 +25,12 @@ PARAMETERS_MAP = [
     'AttributeValue',
 ]
 
+# Maximum number of part numbers per API request
+PART_NUMBERS_MAX = 10
+
+# Maximum time to wait for API response (seconds)
+SEARCH_TIMEOUT = 20
+
 PRICING_MAP = [
     'PriceBreaks',
     'Quantity',
@@ -63,36 +75,46 @@ def find_categories(part_details: str):
         return None, None
 
 
-def fetch_part_info(part_number: str) -> dict:
-    ''' Fetch part data from API '''
+class PartSearchRequest(MouserPartSearchRequest):
+    ''' Part search request with connect/read timeouts, using pooled connection '''
 
-    from wrapt_timeout_decorator import timeout
+    def post(self, url, body):
+        headers = {
+            'Content-Type': 'application/json',
+        }
+        return http_client.post(url, data=json.dumps(body), headers=headers,
+                                timeout=(http_client.CONNECT_TIMEOUT, SEARCH_TIMEOUT))
 
-    setup_environment()
-    part_info = {}
 
-    @timeout(dec_timeout=20)
-    def search_timeout():
-        try:
-            request = MouserPartSearchRequest('partnumber')
-            request.part_search(part_number)
-        except FileNotFoundError as e:
-            error_message = repr(e.args[0])
-            error_message = error_message.strip("'")
-            from ..common.tools import cprint
-            cprint(f'[INFO] Warning: {error_message}', silent=False)
-        finally:
-            # Mouser 0.1.6 API update: single part list is returned, instead of dict
-            return request.get_clean_response()[0]
+def search_part_numbers(part_number: str) -> dict:
+    ''' Query API for part number(s) (separated by "|"), returns raw API response '''
 
-    # Query part number
-    try:
-        part: dict = search_timeout()
-    except:
-        part = None
+    setup_environment()
+    if not rate_limiter.acquire('Mouser'):
+        return {}
 
-    if not part:
-        return part_info
+    try:
+        request = PartSearchRequest('partnumber')
+        request.part_search(part_number)
+    except FileNotFoundError as e:
+        error_message = repr(e.args[0])
+        error_message = error_message.strip("'")
+        from ..common.tools import cprint
+        cprint(f'[INFO] Warning: {error_message}', silent=False)
+        return {}
+    except requests.exceptions.Timeout:
+        set_request_error(REQUEST_TIMEOUT)
+        return {}
+    except requests.exceptions.RequestException:
+        set_request_error(REQUEST_HTTP_ERROR)
+        return {}
+
+    return request.get_response()
+
+
+def parse_part(part: dict) -> dict:
+    ''' Convert API part data to part info '''
+    part_info = {}
 
     # Check for empty response
     empty = True
@@ -121,7 +143,7 @@ def fetch_part_info(part_number: str) -> dict:
     part_info['parameters'] = {}
     [parameter_key, name_key, value_key] = PARAMETERS_MAP
 
-    for parameter in range(len(part[parameter_key])):
+    for parameter in range(len(part.get(parameter_key, None) or [])):
         parameter_name = part[parameter_key][parameter][name_key]
         parameter_value = part[parameter_key][parameter][value_key]
         # Append to parameters dictionary
@@ -131,12 +153,12 @@ def fetch_part_info(part_number: str) -> dict:
     part_info['pricing'] = {}
     [pricing_key, qty_key, price_key, currency_key] = PRICING_MAP
 
-    for price_break in part[pricing_key]:
+    for price_break in part.get(pricing_key, None) or []:
         quantity = price_break[qty_key]
         price = price_break[price_key]
         part_info['pricing'][quantity] = price
 
-    if part[pricing_key]:
+    if part.get(pricing_key, None):
         part_info['currency'] = part[pricing_key][0][currency_key]
     else:
         part_info['currency'] = 'USD'
@@ -153,6 +175,60 @@ def fetch_part_info(part_number: str) -> dict:
     return part_info
 
 
+def fetch_part_info(part_number: str) -> dict:
+    ''' Fetch part data from API '''
+    part_info = {}
+
+    # Query part number
+    try:
+        response = search_part_numbers(part_number)
+        # Use first part returned
+        part = response['SearchResults'].get('Parts', [])[0]
+    except:
+        part = None
+
+    if not part:
+        return part_info
+
+    return parse_part(part)
+
+
+def fetch_parts_info(part_numbers: list) -> dict:
+    ''' Fetch data of several parts from API (up to 10 part numbers per request), returns part data for each part number '''
+    parts_info = {}
+
+    # Remove duplicates (keep order)
+    part_numbers = list(dict.fromkeys(part_numbers))
+    for idx in range(0, len(part_numbers), PART_NUMBERS_MAX):
+        chunk = part_numbers[idx:idx + PART_NUMBERS_MAX]
+
+        # Query part numbers
+        try:
+            response = search_part_numbers('|'.join(chunk))
+            parts = response['SearchResults'].get('Parts', [])
+        except:
+            # Request failed (error is recorded), part numbers are not searched again
+            for part_number in chunk:
+                parts_info[part_number] = {}
+            continue
+
+        # Split response (first matching part for each part number)
+        for part in parts or []:
+            for key in ['ManufacturerPartNumber', 'MouserPartNumber']:
+                part_number = str(part.get(key, '')).lower()
+                for requested in chunk:
+                    if requested.lower() == part_number and requested not in parts_info:
+                        parts_info[requested] = parse_part(part)
+
+    # Part numbers missing from batch results (partial matches, results limit) are searched one by one,
+    # like single part searches which use first part returned
+    for part_number in part_numbers:
+        if part_number not in parts_info:
+            parts_info[part_number] = fetch_part_info(part_number)
+
+    return parts_info
+
+
 def test_api() -> bool:
     ''' Test method for API '''
 
@@ -0,0 +1,143 @@
+import os
+import sqlite3
+import threading
+import time
+
+from ..config import settings
+from ..common.tools import cprint, set_request_error, REQUEST_QUOTA_EXCEEDED
+
+# Suppliers sharing the same API key (and quota)
+QUOTA_GROUPS = {
+    'Farnell': 'Element14',
+    'Newark': 'Element14',
+}
+
+_connection = None
+_connection_path = None
+_lock = threading.Lock()
+
+
+def open_database() -> sqlite3.Connection:
+    ''' Open rate limits database (shared by all processes) '''
+    global _connection
+    global _connection_path
+
+    database = settings.RATE_LIMITS_DATABASE
+
+    # Re-use connection unless cache path was changed
+    if _connection is not None and _connection_path == database:
+        return _connection
+
+    if not os.path.exists(os.path.dirname(database)):
+        os.makedirs(os.path.dirname(database), exist_ok=True)
+
+    connection = sqlite3.connect(database, check_same_thread=False, isolation_level=None, timeout=10)
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('''
+        CREATE TABLE IF NOT EXISTS rate_limits (
+            supplier TEXT PRIMARY KEY,
+            tokens REAL NOT NULL,
+            updated REAL NOT NULL,
+            day TEXT NOT NULL,
+            requests INTEGER NOT NULL
+        )
+    ''')
+
+    if _connection is not None:
+        _connection.close()
+    _connection = connection
+    _connection_path = database
+
+    return _connection
+
+
+def get_limits(supplier: str) -> tuple:
+    ''' Get quota group, requests per second, burst size and daily quota of supplier '''
+    group = QUOTA_GROUPS.get(supplier, supplier)
+    limits = settings.SUPPLIER_RATE_LIMITS.get(group, {})
+
+    rate = limits.get('requests_per_minute', 0) / 60
+    # Allow one second worth of requests at once
+    burst = max(rate, 1)
+
+    return group, rate, burst, limits.get('daily_quota', 0)
+
+
+def try_acquire(supplier: str) -> tuple:
+    ''' Take one request token, returns (acquired, seconds to wait before next try) '''
+    group, rate, burst, quota = get_limits(supplier)
+    now = time.time()
+    today = time.strftime('%Y-%m-%d')
+
+    with _lock:
+        connection = open_database()
+        # Lock database for other processes
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            row = connection.execute(
+                'SELECT tokens, updated, day, requests FROM rate_limits WHERE supplier = ?',
+                (group,),
+            ).fetchone()
+            tokens, updated, day, requests = row if row else (burst, now, today, 0)
+
+            # Daily quota
+            if day != today:
+                day, requests = today, 0
+            if quota and requests >= quota:
+                return False, None
+
+            # Refill bucket
+            if rate:
+                tokens = min(burst, tokens + (now - updated) * rate)
+            else:
+                tokens = burst
+
+            wait = 0
+            if tokens >= 1:
+                tokens -= 1
+                requests += 1
+            else:
+                wait = (1 - tokens) / rate
+
+            connection.execute(
+                'INSERT OR REPLACE INTO rate_limits (supplier, tokens, updated, day, requests) VALUES (?, ?, ?, ?, ?)',
+                (group, tokens, now, day, requests),
+            )
+        finally:
+            connection.execute('COMMIT')
+
+    return not wait, wait
+
+
+def acquire(supplier: str, timeout=None) -> bool:
+    ''' Wait for supplier API request slot, returns False if daily quota is exhausted (or timed out) '''
+    deadline = time.time() + timeout if timeout is not None else None
+
+    while True:
+        acquired, wait = try_acquire(supplier)
+        if acquired:
+            return True
+        if wait is None:
+            cprint(f'[INFO]\tWarning: {supplier} daily API quota exhausted', silent=settings.SILENT)
+            set_request_error(REQUEST_QUOTA_EXCEEDED)
+            return False
+        if deadline is not None and time.time() + wait > deadline:
+            return False
+        time.sleep(wait)
+
+
+def get_remaining_quota(supplier: str) -> int:
+    ''' Get number of API requests left today for supplier (None if unlimited) '''
+    group, _, _, quota = get_limits(supplier)
+    if not quota:
+        return None
+
+    with _lock:
+        row = open_database().execute(
+            'SELECT day, requests FROM rate_limits WHERE supplier = ?',
+            (group,),
+        ).fetchone()
+
+    if not row or row[0] != time.strftime('%Y-%m-%d'):
+        return quota
+    return max(quota - row[1], 0)
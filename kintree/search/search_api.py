@@ -1,44 +1,407 @@
 import os
+import queue
+import sqlite3
+import threading
 import time
 
+import yaml
+
 from ..config import settings, config_interface
+from ..common.tools import cprint
+from . import cache_manager
+
+# Search results cache (SQLite database)
+SCHEMA_VERSION = 2
+# Failed searches
+NOT_FOUND = 'not_found'
+ERROR = 'error'
+_connection = None
+_connection_path = None
+_lock = threading.RLock()
+
+# Background refresh of stale entries
+REFRESH_WORKERS = 2
+_refresh_queue = queue.Queue()
+_refresh_pending = set()
+_refresh_workers = []
+
+
+def open_cache() -> sqlite3.Connection:
+    ''' Open search results cache database, create and migrate it if needed '''
+    global _connection
+    global _connection_path
 
+    database = settings.search_results['database']
 
-def load_from_file(search_file, test_mode=False) -> dict:
-    ''' Fetch part data from file '''
-    cache_valid = settings.CACHE_VALID_DAYS * 24 * 3600
+    with _lock:
+        # Re-use connection unless cache path was changed
+        if _connection is not None and _connection_path == database:
+            return _connection
+        close_cache()
 
-    # Load data from file if cache enabled
-    if settings.CACHE_ENABLED:
+        # Check if search/results directory needs to be created
+        if not os.path.exists(os.path.dirname(database)):
+            os.makedirs(os.path.dirname(database), exist_ok=True)
+
+        connection = sqlite3.connect(database, check_same_thread=False, isolation_level=None)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        connection.execute('''
+            CREATE TABLE IF NOT EXISTS search_results (
+                supplier TEXT NOT NULL,
+                store TEXT NOT NULL DEFAULT '',
+                part_number TEXT NOT NULL,
+                timestamp INTEGER NOT NULL,
+                data BLOB NOT NULL,
+                PRIMARY KEY (supplier, store, part_number)
+            )
+        ''')
+        upgrade_schema(connection)
+
+        # Import legacy YAML files (retried on next use if import fails)
         try:
-            part_data = config_interface.load_file(search_file)
-        except FileNotFoundError:
+            migrate_yaml_files(connection)
+        except Exception:
+            connection.close()
+            raise
+
+        _connection = connection
+        _connection_path = database
+
+    # Expired entries and size limits are handled in the background
+    cache_manager.start_sweeper()
+
+    return _connection
+
+
+def upgrade_schema(connection: sqlite3.Connection):
+    ''' Upgrade cache database schema to latest version '''
+    version = connection.execute('PRAGMA user_version').fetchone()[0]
+
+    if version < 1:
+        # Access tracking (LRU eviction)
+        connection.execute('ALTER TABLE search_results ADD COLUMN last_access INTEGER NOT NULL DEFAULT 0')
+        connection.execute('UPDATE search_results SET last_access = timestamp')
+        connection.execute('CREATE INDEX IF NOT EXISTS search_results_last_access ON search_results (last_access)')
+
+    if version < 2:
+        # Failed searches (negative entries)
+        connection.execute('''
+            CREATE TABLE IF NOT EXISTS search_failures (
+                supplier TEXT NOT NULL,
+                store TEXT NOT NULL DEFAULT '',
+                part_number TEXT NOT NULL,
+                timestamp INTEGER NOT NULL,
+                reason TEXT NOT NULL,
+                PRIMARY KEY (supplier, store, part_number)
+            )
+        ''')
+
+    connection.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+
+def dump_data(part_info: dict) -> bytes:
+    ''' Serialize part data stored in cache database (YAML) '''
+    return yaml.dump(part_info, Dumper=getattr(yaml, 'CSafeDumper', yaml.SafeDumper), allow_unicode=True).encode()
+
+
+def load_data(data: bytes) -> dict:
+    ''' Deserialize part data stored in cache database (safe YAML loader, no code execution) '''
+    return yaml.load(data, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
+
+
+def close_cache():
+    ''' Close search results cache database '''
+    global _connection
+    global _connection_path
+
+    with _lock:
+        if _connection is not None:
+            _connection.close()
+        _connection = None
+        _connection_path = None
+
+
+def split_cache_name(name: str) -> tuple:
+    ''' Split legacy cache file name into supplier, store and part number '''
+    try:
+        supplier_store, part_number = name.split('_', 1)
+    except ValueError:
+        return None, None, None
+
+    # Longest match first (eg. "Element14" vs "Element")
+    for supplier in sorted(settings.CONFIG_SUPPLIERS.keys(), key=len, reverse=True):
+        if supplier_store.startswith(supplier):
+            return supplier, supplier_store[len(supplier):], part_number
+
+    return supplier_store, '', part_number
+
+
+def migrate_yaml_files(connection: sqlite3.Connection, silent=True) -> int:
+    ''' Import legacy YAML search results (one file per part) into cache database '''
+    directory = settings.search_results['directory']
+    extension = settings.search_results['extension']
+
+    imported = []
+    skipped = 0
+    # Single transaction for all imported files
+    connection.execute('BEGIN')
+    try:
+        # Part numbers containing "/" were saved in sub-directories
+        for root, dirs, files in os.walk(directory):
+            for file in files:
+                if not file.endswith(extension):
+                    continue
+                file_path = os.path.join(root, file)
+                name = os.path.relpath(file_path, directory)[:-len(extension)].replace(os.sep, '/')
+                supplier, store, part_number = split_cache_name(name)
+                part_info = config_interface.load_file(file_path, cache=False)
+
+                if not supplier or not isinstance(part_info, dict):
+                    # Unreadable files are kept
+                    skipped += 1
+                    continue
+
+                # Use file timestamp if not stored in file
+                timestamp = part_info.pop('search_timestamp', None)
+                if not isinstance(timestamp, int):
+                    timestamp = int(os.path.getmtime(file_path))
+                write_entry(connection, part_info, supplier, part_number, store, timestamp)
+                imported.append(file_path)
+    except Exception:
+        connection.execute('ROLLBACK')
+        raise
+    connection.execute('COMMIT')
+
+    # Files are only removed once imported
+    for file_path in imported:
+        try:
+            os.remove(file_path)
+        except OSError:
+            pass
+    # Remove empty sub-directories
+    for root, dirs, files in os.walk(directory, topdown=False):
+        if os.path.normpath(root) != os.path.normpath(directory) and not os.listdir(root):
+            os.rmdir(root)
+
+    if imported:
+        cprint(f'[INFO]\tImported {len(imported)} search results into cache database', silent=silent)
+    if skipped:
+        cprint(f'[INFO]\tWarning: {skipped} search results files could not be imported', silent=silent)
+    return len(imported)
+
+
+def load_from_cache(supplier: str, part_number: str, store='', test_mode=False, stale=False, valid_days=None) -> dict:
+    ''' Fetch part data from cache (stale: include expired data which can still be served while refreshed) '''
+    if valid_days is None:
+        valid_days = settings.CACHE_VALID_DAYS
+    cache_valid = valid_days * 24 * 3600
+    if stale:
+        cache_valid = max(cache_valid, settings.CACHE_STALE_VALID_DAYS * 24 * 3600)
+
+    # Load data from cache if enabled
+    if not settings.CACHE_ENABLED:
+        return None
+
+    with _lock:
+        connection = open_cache()
+        row = connection.execute(
+            'SELECT timestamp, data FROM search_results WHERE supplier = ? AND store = ? AND part_number = ?',
+            (supplier, store, part_number),
+        ).fetchone()
+
+        if not row:
             return None
 
         # Check cache validity
-        try:
-            # Get timestamp
-            timestamp = int(time.time() - part_data['search_timestamp'])
-        except (KeyError, TypeError):
+        timestamp, data = row
+        if int(time.time()) - timestamp < cache_valid or test_mode:
+            # Track access
+            connection.execute(
+                'UPDATE search_results SET last_access = ? WHERE supplier = ? AND store = ? AND part_number = ?',
+                (int(time.time()), supplier, store, part_number),
+            )
+            return load_data(data)
+
+    return None
+
+
+def save_to_cache(part_info: dict, supplier: str, part_number: str, store='', update_ts=True, timestamp=None, force=False):
+    ''' Save part data to cache '''
+
+    # Save data if cache enabled
+    if not settings.CACHE_ENABLED and not force:
+        return
+
+    with _lock:
+        connection = open_cache()
+        if timestamp is None:
             timestamp = int(time.time())
+            if not update_ts:
+                # Keep previous timestamp
+                row = connection.execute(
+                    'SELECT timestamp FROM search_results WHERE supplier = ? AND store = ? AND part_number = ?',
+                    (supplier, store, part_number),
+                ).fetchone()
+                if row:
+                    timestamp = row[0]
+
+        write_entry(connection, part_info, supplier, part_number, store, timestamp)
+
+    cache_manager.notify_write()
+
+
+def write_entry(connection: sqlite3.Connection, part_info: dict, supplier: str, part_number: str, store: str, timestamp: int):
+    ''' Insert or replace part data in cache database '''
+    connection.execute(
+        'INSERT OR REPLACE INTO search_results (supplier, store, part_number, timestamp, data, last_access) VALUES (?, ?, ?, ?, ?, ?)',
+        (supplier, store, part_number, timestamp, dump_data(part_info), int(time.time())),
+    )
+    connection.execute(
+        'DELETE FROM search_failures WHERE supplier = ? AND store = ? AND part_number = ?',
+        (supplier, store, part_number),
+    )
+
+
+def run_refresh_worker():
+    ''' Background refresh loop '''
+    while True:
+        fetch, supplier, part_number, store = _refresh_queue.get()
+        try:
+            part_info = fetch(supplier, part_number, store)
+            if part_info:
+                # Replace stale entry in a single statement
+                save_to_cache(part_info, supplier, part_number, store)
+                cprint(f'[INFO]\tRefreshed {supplier} cached data for {part_number}', silent=settings.HIDE_DEBUG)
+        except Exception as e:
+            cprint(f'[INFO]\tWarning: {supplier} refresh failed for {part_number} ({repr(e)})', silent=settings.HIDE_DEBUG)
+        finally:
+            with _lock:
+                _refresh_pending.discard((supplier, store, part_number))
+
 
-        if timestamp < cache_valid or test_mode:
-            return part_data
+def refresh_in_background(fetch, supplier: str, part_number: str, store='') -> bool:
+    ''' Queue refresh of stale part data, fetch(supplier, part_number, store) returns new part data '''
+    with _lock:
+        # Refresh each part only once at a time
+        if (supplier, store, part_number) in _refresh_pending:
+            return False
+        _refresh_pending.add((supplier, store, part_number))
+
+        # Start workers on first use
+        while len(_refresh_workers) < REFRESH_WORKERS:
+            worker = threading.Thread(target=run_refresh_worker, name='cache_refresh', daemon=True)
+            worker.start()
+            _refresh_workers.append(worker)
+
+    _refresh_queue.put((fetch, supplier, part_number, store))
+    return True
+
+
+def get_failure_valid(reason: str) -> int:
+    ''' Get validity of failed search (in seconds) '''
+    if reason == NOT_FOUND:
+        return settings.CACHE_NOT_FOUND_VALID_MINUTES * 60
+    return settings.CACHE_ERROR_VALID_MINUTES * 60
+
+
+def load_failure(supplier: str, part_number: str, store='') -> str:
+    ''' Get reason of recent failed search for part, if any '''
+    if not settings.CACHE_ENABLED:
+        return None
+
+    with _lock:
+        connection = open_cache()
+        row = connection.execute(
+            'SELECT timestamp, reason FROM search_failures WHERE supplier = ? AND store = ? AND part_number = ?',
+            (supplier, store, part_number),
+        ).fetchone()
+
+    if row:
+        timestamp, reason = row
+        if int(time.time()) - timestamp < get_failure_valid(reason):
+            return reason
 
     return None
 
 
-def save_to_file(part_info, search_file, update_ts=True):
-    ''' Save part data to file '''
+def save_failure(supplier: str, part_number: str, store='', reason=NOT_FOUND):
+    ''' Record failed search for part (not found, timeout, HTTP error...) '''
+    if not settings.CACHE_ENABLED:
+        return
 
-    # Check if search/results directory needs to be created
-    if not os.path.exists(os.path.dirname(search_file)):
-        os.mkdir(os.path.dirname(search_file))
+    with _lock:
+        connection = open_cache()
+        connection.execute(
+            'INSERT OR REPLACE INTO search_failures (supplier, store, part_number, timestamp, reason) VALUES (?, ?, ?, ?, ?)',
+            (supplier, store, part_number, int(time.time()), reason),
+        )
 
-    if update_ts:
-        # Update timestamp
-        part_info['search_timestamp'] = int(time.time())
 
-    # Save data if cache enabled
-    if settings.CACHE_ENABLED:
-        config_interface.dump_file(part_info, search_file)
+def clear_failures(supplier=None):
+    ''' Forget failed searches (eg. after supplier settings were updated) '''
+    with _lock:
+        connection = open_cache()
+        if supplier:
+            connection.execute('DELETE FROM search_failures WHERE supplier = ?', (supplier,))
+        else:
+            connection.execute('DELETE FROM search_failures')
+
+
+def sweep_cache(max_age=0, max_size=0, max_entries=0) -> tuple:
+    ''' Remove expired entries, then least recently used entries until cache fits in size limits '''
+    removed = 0
+
+    with _lock:
+        connection = open_cache()
+        connection.execute('BEGIN')
+        try:
+            # Expired failed searches
+            connection.execute(
+                'DELETE FROM search_failures WHERE reason = ? AND timestamp < ?',
+                (NOT_FOUND, int(time.time() - get_failure_valid(NOT_FOUND))),
+            )
+            connection.execute(
+                'DELETE FROM search_failures WHERE reason != ? AND timestamp < ?',
+                (NOT_FOUND, int(time.time() - get_failure_valid(ERROR))),
+            )
+
+            # Expired entries
+            if max_age:
+                removed += connection.execute(
+                    'DELETE FROM search_results WHERE timestamp < ?',
+                    (int(time.time() - max_age),),
+                ).rowcount
+
+            # Number of entries
+            entries = connection.execute('SELECT COUNT(*) FROM search_results').fetchone()[0]
+            if max_entries and entries > max_entries:
+                removed += connection.execute(
+                    'DELETE FROM search_results WHERE rowid IN '
+                    '(SELECT rowid FROM search_results ORDER BY last_access LIMIT ?)',
+                    (entries - max_entries,),
+                ).rowcount
+
+            # Size of entries
+            if max_size:
+                size = connection.execute('SELECT COALESCE(SUM(LENGTH(data)), 0) FROM search_results').fetchone()[0]
+                if size > max_size:
+                    # Walk entries from least recently used
+                    evict = []
+                    for rowid, entry_size in connection.execute(
+                            'SELECT rowid, LENGTH(data) FROM search_results ORDER BY last_access'):
+                        if size <= max_size:
+                            break
+                        evict.append((rowid,))
+                        size -= entry_size
+                    connection.executemany('DELETE FROM search_results WHERE rowid = ?', evict)
+                    removed += len(evict)
+
+            remaining = connection.execute('SELECT COUNT(*) FROM search_results').fetchone()[0]
+        except Exception:
+            # Leave shared connection usable
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+
+    return removed, remaining
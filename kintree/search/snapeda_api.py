@@ -1,15 +1,26 @@
+from concurrent.futures import ThreadPoolExecutor
+
 from ..config import settings
-from ..common.tools import download, download_with_retry
+from ..common.tools import download
+from . import download_cache, search_api
 
+# Name of SnapEDA responses in search cache
+CACHE_NAME = 'SnapEDA'
 API_BASE_URL = 'https://snapeda.eeinte.ch/?'
 SNAPEDA_URL = 'https://www.snapeda.com'
 
 
 def fetch_snapeda_part_info(part_number: str) -> dict:
-    ''' Fetch SnapEDA part data from API '''
+    ''' Fetch SnapEDA part data from API (or cache) '''
+
+    data = search_api.load_from_cache(CACHE_NAME, part_number, valid_days=settings.CACHE_SNAPEDA_VALID_DAYS)
+    if data:
+        return data
 
     api_url = API_BASE_URL + part_number.replace(' ', '%20')
     data = download(api_url, timeout=10)
+    if data:
+        search_api.save_to_cache(data, CACHE_NAME, part_number)
     return data if data else {}
 
 
@@ -76,41 +87,25 @@ def download_snapeda_images(snapeda_data: dict, silent=False) -> dict:
         part_number = None
 
     if part_number:
-        try:
-            if snapeda_data['symbol_image']:
-                # Form path
-                image_name = f'{part_number}_symbol.png'
-                image_location = settings.search_images + image_name
-
-                # Download symbol image
-                symbol = download_with_retry(
-                    url=snapeda_data['symbol_image'],
-                    full_path=image_location,
-                    filetype='Image',
-                    silent=silent,
-                )
-                if symbol:
-                    images['symbol'] = image_location
-        except KeyError:
-            pass
-
-        try:
-            if snapeda_data['footprint_image']:
-                # Form path
-                image_name = f'{part_number}_footprint.png'
-                image_location = settings.search_images + image_name
-
-                # Download symbol image
-                footprint = download_with_retry(
-                    url=snapeda_data['footprint_image'],
-                    full_path=image_location,
-                    filetype='Image',
-                    silent=silent,
-                )
-                if footprint:
-                    images['footprint'] = image_location
-        except KeyError:
-            pass
+        # Download symbol and footprint images at the same time
+        downloads = {}
+        with ThreadPoolExecutor(max_workers=len(images)) as executor:
+            for image_type in images.keys():
+                image_url = snapeda_data.get(f'{image_type}_image', None)
+                if image_url:
+                    # Form path
+                    image_location = settings.search_images + f'{part_number}_{image_type}.png'
+                    downloads[image_type] = (image_location, executor.submit(
+                        download_cache.download_file,
+                        url=image_url,
+                        full_path=image_location,
+                        filetype='Image',
+                        silent=silent,
+                    ))
+
+        for image_type, (image_location, future) in downloads.items():
+            if future.result():
+                images[image_type] = image_location
 
     return images
 
@@ -0,0 +1,82 @@
+import importlib
+import threading
+
+from ..config import settings
+
+# Supplier APIs: module (imported on first use), user search keys configuration,
+# supplier name is passed to API functions (stores sharing the same API),
+# batched searches of supplier order codes (instead of manufacturer part numbers)
+SUPPLIERS = {
+    'Digi-Key': {'module': 'digikey_api', 'config': 'CONFIG_DIGIKEY', 'pass_supplier': False},
+    'Mouser': {'module': 'mouser_api', 'config': 'CONFIG_MOUSER', 'pass_supplier': False},
+    'Element14': {'module': 'element14_api', 'config': 'CONFIG_ELEMENT14', 'pass_supplier': True, 'order_codes': True},
+    'Farnell': {'module': 'element14_api', 'config': 'CONFIG_ELEMENT14', 'pass_supplier': True, 'order_codes': True},
+    'Newark': {'module': 'element14_api', 'config': 'CONFIG_ELEMENT14', 'pass_supplier': True, 'order_codes': True},
+    'LCSC': {'module': 'lcsc_api', 'config': 'CONFIG_LCSC', 'pass_supplier': False},
+    'Jameco': {'module': 'jameco_api', 'config': 'CONFIG_JAMECO', 'pass_supplier': False},
+    'TME': {'module': 'tme_api', 'config': 'CONFIG_TME', 'pass_supplier': False},
+    'AutomationDirect': {'module': 'automationdirect_api', 'config': 'CONFIG_AUTOMATIONDIRECT', 'pass_supplier': False},
+}
+# Number of default search keys returned by supplier APIs
+SEARCH_KEYS_COUNT = 10
+
+_import_lock = threading.Lock()
+
+
+def is_supported(supplier: str) -> bool:
+    ''' Check if supplier has an API '''
+    return supplier in SUPPLIERS
+
+
+def get_api(supplier: str):
+    ''' Get supplier API module (imported with its SDK on first use) '''
+    with _import_lock:
+        return importlib.import_module(f'.{SUPPLIERS[supplier]["module"]}', __package__)
+
+
+def get_arguments(supplier: str) -> list:
+    ''' Get supplier specific arguments of API functions '''
+    if SUPPLIERS[supplier]['pass_supplier']:
+        return [supplier]
+    return []
+
+
+def fetch_part_info(supplier: str, part_number: str) -> dict:
+    ''' Fetch part data from supplier API '''
+    return get_api(supplier).fetch_part_info(part_number, *get_arguments(supplier))
+
+
+def supports_batch(supplier: str) -> bool:
+    ''' Check if supplier API fetches several parts per request '''
+    return is_supported(supplier) and hasattr(get_api(supplier), 'fetch_parts_info')
+
+
+def fetch_parts_info(supplier: str, part_numbers: list, order_codes=False) -> dict:
+    ''' Fetch data of several parts from supplier API (one request per part if batches are not supported)
+
+    order_codes: part numbers are supplier order codes (searched in batches when supported by supplier)
+    '''
+    if supports_batch(supplier):
+        if order_codes and SUPPLIERS[supplier].get('order_codes', False):
+            return get_api(supplier).fetch_parts_info(part_numbers, *get_arguments(supplier), order_codes=True)
+        return get_api(supplier).fetch_parts_info(part_numbers, *get_arguments(supplier))
+    return {part_number: fetch_part_info(supplier, part_number) for part_number in part_numbers}
+
+
+def get_default_search_keys(supplier: str) -> list:
+    ''' Get supplier data keys used to fill part form (empty keys for unknown supplier) '''
+    if not is_supported(supplier):
+        return [''] * SEARCH_KEYS_COUNT
+    return get_api(supplier).get_default_search_keys()
+
+
+def get_user_search_key(supplier: str, user_key: str) -> str:
+    ''' Get supplier data key set by user for form field '''
+    return getattr(settings, SUPPLIERS[supplier]['config']).get(user_key, None)
+
+
+def test_api(supplier: str) -> bool:
+    ''' Test supplier API settings '''
+    if not is_supported(supplier):
+        return False
+    return get_api(supplier).test_api()
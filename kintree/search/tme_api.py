@@ -3,12 +3,20 @@ import collections
 import hashlib
 import hmac
 import os
+import socket
 import urllib.parse
 import urllib.request
 import json
 
 # from ..common.tools import download
+from ..common.tools import clear_request_error, get_request_error, set_request_error, REQUEST_HTTP_ERROR, REQUEST_TIMEOUT
 from ..config import config_interface, settings
+from . import rate_limiter
+
+# Maximum number of symbols per API request
+SYMBOL_LIST_MAX = 50
+# Maximum number of concurrent API requests
+MAX_CONCURRENT_REQUESTS = 4
 
 PRICING_MAP = [
     'PriceList',
@@ -90,107 +98,138 @@ def tme_api_request(endpoint, tme_api_settings, params, api_host='https://api.tm
 
 def tme_api_query(request: urllib.request.Request) -> dict:
     response = None
+    if not rate_limiter.acquire('TME'):
+        return response
     try:
-        data = urllib.request.urlopen(request).read().decode('utf8')
+        data = urllib.request.urlopen(request, timeout=20).read().decode('utf8')
     except urllib.error.HTTPError:
+        set_request_error(REQUEST_HTTP_ERROR)
+        data = None
+    except socket.timeout:
+        set_request_error(REQUEST_TIMEOUT)
+        data = None
+    except (urllib.error.URLError, OSError) as e:
+        # Connection errors (timeouts while connecting are wrapped in URLError)
+        if isinstance(getattr(e, 'reason', None), socket.timeout):
+            set_request_error(REQUEST_TIMEOUT)
+        else:
+            set_request_error(REQUEST_HTTP_ERROR)
         data = None
     if data:
         response = json.loads(data)
     return response
 
 
-def fetch_part_info(part_number: str) -> dict:
-
-    def search_product(response):
-        found = False
-        index = 0
-        for product in response['Data']['ProductList']:
-            if product['Symbol'] == part_number:
-                found = True
-                break
-            index = index + 1
-        return found, index
+def fetch_parts_info(part_numbers: list) -> dict:
+    ''' Fetch data of several parts (symbols) from API, returns part data for each part number '''
+    from concurrent.futures import ThreadPoolExecutor
 
+    # Settings are loaded once for all requests
     tme_api_settings = config_interface.load_file(settings.CONFIG_TME_API)
-    params = {'SymbolList[0]': part_number}
-    response = tme_api_query(tme_api_request('/Products/GetProducts', tme_api_settings, params))
-
-    if response is None or response['Status'] != 'OK':
-        return {}
-    # in the case if multiple parts returned
-    # (for e.g. if we looking for NE555A we could have NE555A and NE555AB in the results)
-    found = False
-    index = 0
-    for product in response['Data']['ProductList']:
-        if product['Symbol'] == part_number:
-            found = True
-            break
-        index = index + 1
-
-    if not found:
-        return {}
-    part_info = response['Data']['ProductList'][index]
-    part_info['Photo'] = "http:" + part_info['Photo']
-    part_info['ProductInformationPage'] = "http:" + part_info['ProductInformationPage']
-    part_info['category'] = part_info['Category']
-    part_info['subcategory'] = None
-
-    # query the parameters
-    params = {'SymbolList[0]': part_number}
-    response = tme_api_query(tme_api_request('/Products/GetParameters', tme_api_settings, params))
-    # check if accidentally no data returned
-    if response is None or response['Status'] != 'OK':
-        return part_info
-
-    found, index = search_product(response)
-
-    if not found:
-        return part_info
-
-    part_info['parameters'] = {}
-    for param in response['Data']['ProductList'][index]["ParameterList"]:
-        part_info['parameters'][param['ParameterName']] = param['ParameterValue']
-
-    # query the prices
-    params = {'SymbolList[0]': part_number, 'Curreny': 'USD'}
-    response = tme_api_query(tme_api_request('/Products/GetPrices', tme_api_settings, params))
-    # check if accidentally no data returned
-    if response is None or response['Status'] != 'OK':
-        return part_info
-
-    found, index = search_product(response)
-
-    if not found:
-        part_info['currency'] = 'USD'
-        return part_info
-
-    part_info['pricing'] = {}
-    [pricing_key, qty_key, price_key, currency_key] = PRICING_MAP
-
-    for price_break in response['Data']['ProductList'][index][pricing_key]:
-        quantity = price_break[qty_key]
-        price = price_break[price_key]
-        part_info['pricing'][quantity] = price
-
-    part_info['currency'] = response['Data'][currency_key]
-
-    # Query the files associated to the product
-    params = {'SymbolList[0]': part_number}
-    response = tme_api_query(tme_api_request('/Products/GetProductsFiles', tme_api_settings, params))
-    # check if accidentally no products returned
-    if response is None or response['Status'] != 'OK':
-        return part_info
-
-    found, index = search_product(response)
-
-    if not found:
-        return part_info
-
-    for doc in response['Data']['ProductList'][index]['Files']['DocumentList']:
-        if doc['DocumentType'] == 'DTE':
-            part_info['Datasheet'] = 'http:' + doc['DocumentUrl']
-            break
-    return part_info
+
+    def query_products(endpoint, symbols, **params):
+        ''' Query endpoint for list of symbols, returns products indexed by symbol, response data and request error '''
+        # Request errors are recorded per thread
+        clear_request_error()
+        for idx, symbol in enumerate(symbols):
+            params[f'SymbolList[{idx}]'] = symbol
+        request = tme_api_request(endpoint, tme_api_settings, params)
+        if request is None:
+            return {}, None, None
+        response = tme_api_query(request)
+        # check if accidentally no data returned
+        if response is None or response['Status'] != 'OK':
+            return {}, None, get_request_error()
+        # in the case if multiple parts returned
+        # (for e.g. if we looking for NE555A we could have NE555A and NE555AB in the results)
+        products = {product['Symbol']: product for product in response['Data']['ProductList']}
+        return products, response['Data'], None
+
+    def query_endpoints(endpoints, symbols):
+        ''' Query endpoints concurrently for all symbols, returns products and response data of each endpoint '''
+        chunks = [symbols[idx:idx + SYMBOL_LIST_MAX] for idx in range(0, len(symbols), SYMBOL_LIST_MAX)]
+        with ThreadPoolExecutor(max_workers=min(len(endpoints) * len(chunks), MAX_CONCURRENT_REQUESTS) or 1) as executor:
+            queries = []
+            for chunk in chunks:
+                for endpoint, params in endpoints:
+                    queries.append((endpoint, executor.submit(query_products, endpoint, chunk, **params)))
+
+        results = {endpoint: ({}, None) for endpoint, _ in endpoints}
+        error = None
+        for endpoint, query in queries:
+            products, data, query_error = query.result()
+            results[endpoint][0].update(products)
+            if data is not None:
+                results[endpoint] = (results[endpoint][0], data)
+            error = error or query_error
+        # Report request errors of worker threads to caller thread
+        if error:
+            set_request_error(error)
+        return results
+
+    # Remove duplicates (keep order)
+    part_numbers = list(dict.fromkeys(part_numbers))
+
+    # Find products first, other endpoints are only queried for known symbols
+    products, _ = query_endpoints([('/Products/GetProducts', {})], part_numbers)['/Products/GetProducts']
+    found = [part_number for part_number in part_numbers if part_number in products]
+    if found:
+        details = query_endpoints([
+            ('/Products/GetParameters', {}),
+            ('/Products/GetPrices', {'Curreny': 'USD'}),
+            ('/Products/GetProductsFiles', {}),
+        ], found)
+        parameters, _ = details['/Products/GetParameters']
+        prices, prices_data = details['/Products/GetPrices']
+        files, _ = details['/Products/GetProductsFiles']
+
+    parts_info = {}
+    for part_number in part_numbers:
+        if part_number not in found:
+            parts_info[part_number] = {}
+            continue
+
+        part_info = products[part_number]
+        part_info['Photo'] = "http:" + part_info['Photo']
+        part_info['ProductInformationPage'] = "http:" + part_info['ProductInformationPage']
+        part_info['category'] = part_info['Category']
+        part_info['subcategory'] = None
+
+        # Parameters
+        if part_number in parameters:
+            part_info['parameters'] = {}
+            for param in parameters[part_number]["ParameterList"]:
+                part_info['parameters'][param['ParameterName']] = param['ParameterValue']
+
+        # Prices
+        if part_number in prices:
+            part_info['pricing'] = {}
+            [pricing_key, qty_key, price_key, currency_key] = PRICING_MAP
+
+            for price_break in prices[part_number][pricing_key]:
+                quantity = price_break[qty_key]
+                price = price_break[price_key]
+                part_info['pricing'][quantity] = price
+
+            part_info['currency'] = prices_data[currency_key]
+        elif prices_data is not None:
+            part_info['currency'] = 'USD'
+
+        # Files associated to the product
+        if part_number in files:
+            for doc in files[part_number]['Files']['DocumentList']:
+                if doc['DocumentType'] == 'DTE':
+                    part_info['Datasheet'] = 'http:' + doc['DocumentUrl']
+                    break
+
+        parts_info[part_number] = part_info
+
+    return parts_info
+
+
+def fetch_part_info(part_number: str) -> dict:
+    ''' Fetch part data from API '''
+    return fetch_parts_info([part_number]).get(part_number, {})
 
 
 def test_api(check_content=False) -> bool:
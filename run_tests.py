@@ -1,12 +1,20 @@
 import os
 import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
 
 import kintree.config.settings as settings
-from kintree.common.tools import cprint, create_library, download_with_retry
+from kintree.common.tools import cprint, create_library, download_with_retry, get_request_error, REQUEST_QUOTA_EXCEEDED
 from kintree.config import config_interface
-from kintree.database import inventree_api, inventree_interface
+from kintree.database import inventree_api, inventree_interface, upload_index
 from kintree.kicad import kicad_interface
 from kintree.search import (
+    search_api,
+    suppliers,
+    rate_limiter,
+    download_cache,
     digikey_api,
     mouser_api,
     element14_api,
@@ -46,6 +54,10 @@ PART_CATEGORIES = [
 ]
 # Enable tests on extra methods
 ENABLE_TEST_METHODS = True
+# Enable tests on search cache and download methods (no API or InvenTree server needed)
+ENABLE_TEST_CACHE = True
+# Enable tests on InvenTree category trees (no InvenTree server needed)
+ENABLE_TEST_TREES = True
 ###
 
 
@@ -70,6 +82,61 @@ def check_result(status: str, new_part: bool) -> bool:
     return success
 
 
+# Local server for download tests
+class DownloadTestHandler(BaseHTTPRequestHandler):
+    # PDF file (supports range requests), any other path returns HTML page
+    pdf_content = b'%PDF-1.4\n' + b'0' * 4096 + b'\n%%EOF\n'
+    range_starts = []
+    # PDF file with ETag (supports conditional requests)
+    cached_pdf_version = 1
+    cached_pdf_requests = []
+
+    def do_GET(self):
+        if self.path == '/cached.pdf':
+            etag = f'"v{self.cached_pdf_version}"'
+            self.cached_pdf_requests.append(self.headers.get('If-None-Match', None))
+            if self.headers.get('If-None-Match', None) == etag:
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_response(200)
+            body = self.pdf_content.replace(b'0', str(self.cached_pdf_version).encode())
+            self.send_header('Content-Type', 'application/pdf')
+            self.send_header('ETag', etag)
+        elif self.path == '/datasheet.pdf':
+            start = 0
+            if self.headers.get('Range', None):
+                start = int(self.headers['Range'].replace('bytes=', '').split('-')[0])
+                self.range_starts.append(start)
+                self.send_response(206)
+                self.send_header('Content-Range', f'bytes {start}-{len(self.pdf_content) - 1}/{len(self.pdf_content)}')
+            else:
+                self.send_response(200)
+            body = self.pdf_content[start:]
+            self.send_header('Content-Type', 'application/pdf')
+        else:
+            self.send_response(200)
+            body = b'<!DOCTYPE html><html><body>Please enable JavaScript</body></html>'
+            self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# InvenTree items listed from memory (no InvenTree server needed)
+class TreeTestModel:
+    items = []
+    list_calls = 0
+
+    @classmethod
+    def list(cls, api):
+        cls.list_calls += 1
+        return list(cls.items)
+
+
 # --- SETUP ---
 
 # Enable test mode
@@ -116,6 +183,16 @@ if ENABLE_API:
                 cprint('[ PASS ]')
                 break
 
+        # Order codes of parts found by manufacturer part number are searched in one batch
+        pretty_test_print('[MAIN]\tElement14 API Test (order codes batch)')
+        skus = [element14_api.fetch_part_info(part_number, 'Farnell').get('sku', None)
+                for part_number in ['1N4148W-7-F', 'BLM18AG601SN1D']]
+        parts_info = suppliers.fetch_parts_info('Farnell', skus + ['0'], order_codes=True)
+        if not all(skus) or [parts_info[sku].get('sku', None) for sku in skus] != skus or parts_info['0']:
+            cprint('[ FAIL ]')
+        else:
+            cprint('[ PASS ]')
+
     # Test LCSC API
     if 'LCSC' in settings.SUPPORTED_SUPPLIERS_API:
         pretty_test_print('[MAIN]\tLCSC API Test')
@@ -310,6 +387,9 @@ if __name__ == '__main__':
                 'Save InvenTree settings',
                 'Load configuration files',
                 'Build InvenTree category tree (file, db and branch)',
+                'Reuse uploaded image and datasheet',
+                'Create, update and skip part parameters',
+                'Find part with same parameters',
             ]
             method_success = True
             # Line return
@@ -522,6 +602,448 @@ if __name__ == '__main__':
                             print(f'{len(cat_branch)} != 3')
                             method_success = False
 
+                elif method_idx == 15:
+                    # Same image and datasheet for two parts are uploaded once
+                    test_image = 'https://media.digikey.com/Renders/Diodes%20Renders/31;%20SOD-123;%20;%202.jpg'
+                    test_pdf = 'https://www.seielect.com/Catalog/SEI-CF_CFM.pdf'
+                    for part_pk in [1, 2]:
+                        if not inventree_api.upload_part_image(test_image, part_pk, silent=True):
+                            print(' [1] ')
+                            method_success = False
+                    # Uploaded image is named after its content hash
+                    images = [os.path.basename(inventree_api.Part(inventree_api.inventree_api, part_pk).image or '') for part_pk in [1, 2]]
+                    if not upload_index.get_hash(images[0]) or images[0] != images[1]:
+                        print(f' [2] {images} ')
+                        method_success = False
+                    # Uploaded datasheet has its content hash in comment
+                    datasheets = [inventree_api.upload_part_datasheet(test_pdf, f'TEST-{part_pk}', part_pk, silent=True) for part_pk in [1, 2]]
+                    if not datasheets[0] or datasheets[0] != datasheets[1]:
+                        print(f' [3] {datasheets} ')
+                        method_success = False
+
+                elif method_idx == 16:
+                    # Existing parameters of part
+                    templates = inventree_api.get_metadata('templates')['by_pk']
+                    part_parameters = {
+                        templates[item.template].name: item
+                        for item in inventree_api.Parameter.list(inventree_api.inventree_api, model_type='part', model_id=1)
+                    }
+                    skipped_name, updated_name = list(part_parameters.keys())[:2]
+                    new_name = [template.name for template in templates.values()
+                                if template.name not in part_parameters and not getattr(template, 'choices', '') and not getattr(template, 'checkbox', False)][0]
+                    update_inventree = settings.UPDATE_INVENTREE
+                    settings.UPDATE_INVENTREE = True
+                    results = dict(inventree_api.upsert_parameters(1, {
+                        skipped_name: part_parameters[skipped_name].data,
+                        updated_name: f'{part_parameters[updated_name].data}0',
+                        new_name: '1',
+                        'Unknown template': '1',
+                    }))
+                    if results[skipped_name] != (part_parameters[skipped_name].pk, False, False):
+                        print(f' [1] {results[skipped_name]} ')
+                        method_success = False
+                    if results[updated_name] != (part_parameters[updated_name].pk, False, True):
+                        print(f' [2] {results[updated_name]} ')
+                        method_success = False
+                    new_parameter_pk = results[new_name][0]
+                    if not new_parameter_pk or results[new_name][1:] != (True, False):
+                        print(f' [3] {results[new_name]} ')
+                        method_success = False
+                    if results['Unknown template'] != (0, False, False):
+                        print(f' [4] {results["Unknown template"]} ')
+                        method_success = False
+                    # Restore part parameters
+                    results = dict(inventree_api.upsert_parameters(1, {updated_name: part_parameters[updated_name].data}))
+                    if results[updated_name] != (part_parameters[updated_name].pk, False, True):
+                        print(f' [5] {results[updated_name]} ')
+                        method_success = False
+                    if new_parameter_pk:
+                        inventree_api.Parameter(inventree_api.inventree_api, new_parameter_pk).delete()
+                    settings.UPDATE_INVENTREE = update_inventree
+
+                elif method_idx == 17:
+                    category_id = inventree_api.Part(inventree_api.inventree_api, 1).category
+                    templates = inventree_api.get_metadata('templates')['by_pk']
+                    part_parameters = {
+                        templates[item.template].name: item.data
+                        for item in inventree_api.Parameter.list(inventree_api.inventree_api, model_type='part', model_id=1)
+                    }
+                    part_info = {
+                        'parameters': part_parameters,
+                        'manufacturer_name': 'Test Manufacturer',
+                        'manufacturer_part_number': 'Test MPN',
+                    }
+                    # Parameters of parts in category are indexed once
+                    if not inventree_api.is_new_part(category_id, part_info):
+                        print(' [1] ')
+                        method_success = False
+                    index = inventree_api.parameter_index.get(category_id, {})
+                    if 1 not in index.get('loaded', set()) or not index.get('fingerprints', None):
+                        print(' [2] ')
+                        method_success = False
+                    # Indexed part which was deleted from server
+                    deleted_parameters = {name: f'{value}0' for name, value in part_parameters.items()}
+                    templates_by_name = inventree_api.get_metadata('templates')['by_name']
+                    inventree_api.update_parameter_index(999999, category_id=category_id, values={
+                        templates_by_name[name][0].pk: value for name, value in deleted_parameters.items()
+                    })
+                    if 999999 not in index['parts']:
+                        print(' [3] ')
+                        method_success = False
+                    elif inventree_api.is_new_part(category_id, dict(part_info, parameters=deleted_parameters)) or 999999 in index['parts']:
+                        print(' [4] ')
+                        method_success = False
+
+                if method_success:
+                    cprint('[ PASS ]')
+                else:
+                    cprint('[ FAIL ]')
+                    exit_code = -1
+                    break
+
+            # Line return
+            cprint('')
+
+        if ENABLE_TEST_CACHE:
+            methods = [
+                'Import legacy search results files',
+                'Save and load reason of unsuccessful search',
+                'Resume download and reject HTML page',
+                'Rate limits and shared Element14 quota',
+                'Batch search of uncached part numbers',
+                'Reuse and revalidate cached downloads',
+                'Find content hash of uploaded files',
+            ]
+            method_success = True
+            cprint('[MAIN]\tChecking search cache and download methods'.ljust(65))
+            # Use temporary search cache
+            search_results = settings.search_results
+            cache_enabled = settings.CACHE_ENABLED
+            test_directory = tempfile.mkdtemp()
+            search_api.close_cache()
+            settings.search_results = {
+                'directory': os.path.join(test_directory, 'search', ''),
+                'extension': '.yaml',
+                'database': os.path.join(test_directory, 'search', 'search_results.db'),
+            }
+            settings.CACHE_ENABLED = True
+            # Use temporary rate limits
+            supplier_rate_limits = settings.SUPPLIER_RATE_LIMITS
+            rate_limits_database = settings.RATE_LIMITS_DATABASE
+            settings.SUPPLIER_RATE_LIMITS = {
+                'Element14': {'requests_per_minute': 60, 'daily_quota': 3},
+                'Mouser': {'requests_per_minute': 0, 'daily_quota': 0},
+            }
+            settings.RATE_LIMITS_DATABASE = os.path.join(test_directory, 'rate_limits.db')
+            # Use temporary downloads cache
+            search_downloads = settings.search_downloads
+            downloads_database = settings.DOWNLOADS_DATABASE
+            download_stats_database = settings.DOWNLOAD_STATS_DATABASE
+            settings.search_downloads = os.path.join(test_directory, 'downloads', '')
+            settings.DOWNLOADS_DATABASE = os.path.join(test_directory, 'downloads.db')
+            settings.DOWNLOAD_STATS_DATABASE = os.path.join(test_directory, 'download_stats.db')
+            # Use temporary uploads index
+            uploads_database = settings.UPLOADS_DATABASE
+            settings.UPLOADS_DATABASE = os.path.join(test_directory, 'uploads.db')
+
+            for method_idx, method_name in enumerate(methods):
+                pretty_test_print(method_name)
+
+                if method_idx == 0:
+                    # Legacy files (including part number with "/" and unparseable file)
+                    directory = settings.search_results['directory']
+                    os.makedirs(os.path.join(directory, 'Digi-Key_PN'))
+                    config_interface.dump_file({'manufacturer_part_number': 'PN1'}, os.path.join(directory, 'Digi-Key_PN1.yaml'))
+                    config_interface.dump_file({'manufacturer_part_number': 'PN/2'}, os.path.join(directory, 'Digi-Key_PN', '2.yaml'))
+                    unparseable_file = os.path.join(directory, 'Mouser_PN3.yaml')
+                    with open(unparseable_file, 'w') as file:
+                        file.write('manufacturer_part_number: [PN3\n')
+
+                    search_api.open_cache()
+                    if (search_api.load_from_cache('Digi-Key', 'PN1', valid_days=1) or {}).get('manufacturer_part_number') != 'PN1':
+                        method_success = False
+                    if (search_api.load_from_cache('Digi-Key', 'PN/2', valid_days=1) or {}).get('manufacturer_part_number') != 'PN/2':
+                        method_success = False
+                    # Imported files are removed, unparseable file is kept
+                    if os.path.exists(os.path.join(directory, 'Digi-Key_PN1.yaml')) or os.path.exists(os.path.join(directory, 'Digi-Key_PN')):
+                        print(' [1] ')
+                        method_success = False
+                    if not os.path.isfile(unparseable_file) or search_api.load_from_cache('Mouser', 'PN3', valid_days=1):
+                        print(' [2] ')
+                        method_success = False
+
+                elif method_idx == 1:
+                    # Failed searches are stored with their reason
+                    search_api.save_failure('Mouser', 'PN4', reason=search_api.NOT_FOUND)
+                    search_api.save_failure('Element14', 'PN4', store='www.newark.com', reason=search_api.ERROR)
+                    if search_api.load_failure('Mouser', 'PN4') != search_api.NOT_FOUND:
+                        print(' [1] ')
+                        method_success = False
+                    if search_api.load_failure('Element14', 'PN4', store='www.newark.com') != search_api.ERROR:
+                        print(' [2] ')
+                        method_success = False
+                    # Other store
+                    if search_api.load_failure('Element14', 'PN4', store='www.farnell.com'):
+                        print(' [3] ')
+                        method_success = False
+                    # Cleared failures
+                    search_api.clear_failures('Mouser')
+                    if search_api.load_failure('Mouser', 'PN4') or not search_api.load_failure('Element14', 'PN4', store='www.newark.com'):
+                        print(' [4] ')
+                        method_success = False
+
+                elif method_idx == 2:
+                    server = ThreadingHTTPServer(('127.0.0.1', 0), DownloadTestHandler)
+                    threading.Thread(target=server.serve_forever, daemon=True).start()
+                    server_url = f'http://127.0.0.1:{server.server_address[1]}'
+                    # Resume interrupted download
+                    datasheet = os.path.join(test_directory, 'datasheet.pdf')
+                    with open(datasheet + '.part', 'wb') as file:
+                        file.write(DownloadTestHandler.pdf_content[:2048])
+                    if not download_with_retry(f'{server_url}/datasheet.pdf', datasheet, silent=True, filetype='PDF'):
+                        print(' [1] ')
+                        method_success = False
+                    elif DownloadTestHandler.range_starts != [2048] or os.path.exists(datasheet + '.part'):
+                        print(' [2] ')
+                        method_success = False
+                    else:
+                        with open(datasheet, 'rb') as file:
+                            if file.read() != DownloadTestHandler.pdf_content:
+                                print(' [3] ')
+                                method_success = False
+                    # HTML page instead of PDF
+                    html_datasheet = os.path.join(test_directory, 'html_datasheet.pdf')
+                    if download_with_retry(f'{server_url}/html_datasheet.pdf', html_datasheet, silent=True, filetype='PDF'):
+                        print(' [4] ')
+                        method_success = False
+                    if os.path.exists(html_datasheet) or os.path.exists(html_datasheet + '.part'):
+                        print(' [5] ')
+                        method_success = False
+                    server.shutdown()
+                    server.server_close()
+
+                elif method_idx == 3:
+                    # One request per second and 3 requests per day, shared by Element14 stores
+                    if rate_limiter.try_acquire('Farnell') != (True, 0):
+                        print(' [1] ')
+                        method_success = False
+                    acquired, wait = rate_limiter.try_acquire('Newark')
+                    if acquired or not 0 < wait <= 1:
+                        print(' [2] ')
+                        method_success = False
+                    # Refill bucket (one second later)
+                    rate_limiter.open_database().execute('UPDATE rate_limits SET updated = updated - 1')
+                    if not rate_limiter.try_acquire('Element14')[0]:
+                        print(' [3] ')
+                        method_success = False
+                    rate_limiter.open_database().execute('UPDATE rate_limits SET updated = updated - 1')
+                    if not rate_limiter.acquire('Newark', timeout=0) or rate_limiter.get_remaining_quota('Farnell') != 0:
+                        print(' [4] ')
+                        method_success = False
+                    # Daily quota exhausted
+                    rate_limiter.open_database().execute('UPDATE rate_limits SET updated = updated - 1')
+                    if rate_limiter.acquire('Farnell') or get_request_error() != REQUEST_QUOTA_EXCEEDED:
+                        print(' [5] ')
+                        method_success = False
+                    # Unlimited supplier
+                    if not all(rate_limiter.acquire('Mouser', timeout=0) for _ in range(5)) or rate_limiter.get_remaining_quota('Mouser') is not None:
+                        print(' [6] ')
+                        method_success = False
+
+                elif method_idx == 4:
+                    # Record part numbers sent to supplier API
+                    batches = []
+
+                    def fetch_parts_info(supplier, part_numbers, order_codes=False):
+                        batches.append((supplier, list(part_numbers), order_codes))
+                        return {part_number: {'manufacturer_part_number': part_number} for part_number in part_numbers if part_number != 'PN8'}
+
+                    supplier_fetch_parts_info = suppliers.fetch_parts_info
+                    suppliers.fetch_parts_info = fetch_parts_info
+                    search_api.save_to_cache({'manufacturer_part_number': 'PN5'}, 'Mouser', 'PN5')
+                    search_api.save_failure('Mouser', 'PN6', reason=search_api.NOT_FOUND)
+                    try:
+                        parts_info = inventree_interface.supplier_search_batch('Mouser', ['PN5', 'PN6', 'PN7', 'PN8', 'PN7'])
+                        # Cached and recently failed parts are not searched
+                        if batches != [('Mouser', ['PN7', 'PN8'], False)]:
+                            print(' [1] ')
+                            method_success = False
+                        if [parts_info[part_number].get('manufacturer_part_number', None) for part_number in ['PN5', 'PN6', 'PN7', 'PN8']] != ['PN5', None, 'PN7', None]:
+                            print(' [2] ')
+                            method_success = False
+                        # Found part is cached, missing part is recorded as failed search
+                        if not search_api.load_from_cache('Mouser', 'PN7') or search_api.load_failure('Mouser', 'PN8') != search_api.NOT_FOUND:
+                            print(' [3] ')
+                            method_success = False
+                        # Order codes are passed to supplier API
+                        inventree_interface.supplier_search_batch('Farnell', ['PN9'], test_mode=True, order_codes=True)
+                        if batches[-1] != ('Farnell', ['PN9'], True):
+                            print(' [4] ')
+                            method_success = False
+                    finally:
+                        suppliers.fetch_parts_info = supplier_fetch_parts_info
+
+                elif method_idx == 5:
+                    server = ThreadingHTTPServer(('127.0.0.1', 0), DownloadTestHandler)
+                    threading.Thread(target=server.serve_forever, daemon=True).start()
+                    cached_pdf_url = f'http://127.0.0.1:{server.server_address[1]}/cached.pdf'
+                    part_datasheets = [os.path.join(test_directory, f'part{idx}.pdf') for idx in range(2)]
+                    # Same URL is downloaded once, part files are linked to cached file
+                    for part_datasheet in part_datasheets:
+                        if not download_cache.download_file(cached_pdf_url, part_datasheet, filetype='PDF', silent=True):
+                            print(' [1] ')
+                            method_success = False
+                    if DownloadTestHandler.cached_pdf_requests != [None]:
+                        print(' [2] ')
+                        method_success = False
+                    elif not os.path.samefile(part_datasheets[0], part_datasheets[1]):
+                        print(' [3] ')
+                        method_success = False
+                    # Not modified (conditional request)
+                    if not download_cache.download_file(cached_pdf_url, part_datasheets[0], filetype='PDF', silent=True, refresh=True):
+                        print(' [4] ')
+                        method_success = False
+                    if DownloadTestHandler.cached_pdf_requests[1:] != ['"v1"'] or not os.path.samefile(part_datasheets[0], part_datasheets[1]):
+                        print(' [5] ')
+                        method_success = False
+                    # Modified file is downloaded again and linked part files are updated
+                    DownloadTestHandler.cached_pdf_version = 2
+                    if download_cache.refresh_all(silent=True) != {'not_modified': 0, 'modified': 1, 'failed': 0}:
+                        print(' [6] ')
+                        method_success = False
+                    for part_datasheet in part_datasheets:
+                        with open(part_datasheet, 'rb') as file:
+                            if file.read() != DownloadTestHandler.pdf_content.replace(b'0', b'2'):
+                                print(' [7] ')
+                                method_success = False
+                    server.shutdown()
+                    server.server_close()
+
+                elif method_idx == 6:
+                    # Content hash in image names (InvenTree adds suffix to duplicate names) and attachment comments
+                    sha256 = '0123456789abcdef' * 4
+                    for text in [f'{sha256}.jpeg', f'{sha256}_Ab3dE9f.jpeg', f'sha256:{sha256}']:
+                        if upload_index.get_hash(text) != sha256:
+                            print(f' [1] {text} ')
+                            method_success = False
+                    for text in ['1_thumbnail.jpeg', f'{sha256}0.jpeg', '', None]:
+                        if upload_index.get_hash(text):
+                            print(f' [2] {text} ')
+                            method_success = False
+                    # Uploaded files are recorded per server and kind
+                    upload_index.save('http://server1', upload_index.IMAGE, sha256, f'{sha256}.jpeg')
+                    if upload_index.load('http://server1', upload_index.IMAGE, sha256) != f'{sha256}.jpeg':
+                        print(' [3] ')
+                        method_success = False
+                    if upload_index.load('http://server2', upload_index.IMAGE, sha256) or upload_index.load('http://server1', upload_index.ATTACHMENT, sha256):
+                        print(' [4] ')
+                        method_success = False
+                    # Rebuilt index replaces entries of server
+                    datasheet_link = f'http://server1/media/attachments/part/1/{sha256}.pdf'
+                    if upload_index.rebuild('http://server1', [(upload_index.ATTACHMENT, sha256, datasheet_link)]) != 1:
+                        print(' [5] ')
+                        method_success = False
+                    if upload_index.load('http://server1', upload_index.IMAGE, sha256) or upload_index.load('http://server1', upload_index.ATTACHMENT, sha256) != datasheet_link:
+                        print(' [6] ')
+                        method_success = False
+                    upload_index.remove('http://server1', upload_index.ATTACHMENT, sha256)
+                    if upload_index.count('http://server1'):
+                        print(' [7] ')
+                        method_success = False
+
+                if method_success:
+                    cprint('[ PASS ]')
+                else:
+                    cprint('[ FAIL ]')
+                    exit_code = -1
+                    break
+
+            # Restore search cache
+            search_api.close_cache()
+            settings.search_results = search_results
+            settings.CACHE_ENABLED = cache_enabled
+            settings.SUPPLIER_RATE_LIMITS = supplier_rate_limits
+            settings.RATE_LIMITS_DATABASE = rate_limits_database
+            settings.search_downloads = search_downloads
+            settings.DOWNLOADS_DATABASE = downloads_database
+            settings.DOWNLOAD_STATS_DATABASE = download_stats_database
+            settings.UPLOADS_DATABASE = uploads_database
+            # Line return
+            cprint('')
+
+        if ENABLE_TEST_TREES:
+            methods = [
+                'Build category tree from InvenTree items',
+                'Find category ID from path',
+            ]
+            method_success = True
+            cprint('[MAIN]\tChecking InvenTree category trees'.ljust(65))
+            # Default categories, listed as InvenTree items (children before parents)
+            category_data = config_interface.load_file(os.path.join(settings.CONFIG_ROOT, 'inventree', 'categories.yaml'))['CATEGORIES']
+            category_items = []
+            branches = [(None, category_data)]
+            while branches:
+                parent, branch = branches.pop()
+                for name, children in (branch or {}).items():
+                    category_items.insert(0, SimpleNamespace(pk=len(category_items) + 1, parent=parent, name=name))
+                    branches.append((len(category_items), children))
+
+            for method_idx, method_name in enumerate(methods):
+                pretty_test_print(method_name)
+
+                if method_idx == 0:
+                    # Same tree as categories file
+                    if inventree_api.build_tree(category_items) != category_data:
+                        print(' [1] ')
+                        method_success = False
+                    # Items which parent is not listed are placed at the root
+                    branch_items = [SimpleNamespace(pk=2, parent=1, name='Ceramic'), SimpleNamespace(pk=3, parent=2, name='0402')]
+                    if inventree_api.build_tree(branch_items) != {'Ceramic': {'0402': None}}:
+                        print(' [2] ')
+                        method_success = False
+                    if inventree_api.build_tree([]) != {}:
+                        print(' [3] ')
+                        method_success = False
+
+                elif method_idx == 1:
+                    metadata_model = inventree_api.METADATA_MODELS['categories']
+                    inventree_api.METADATA_MODELS['categories'] = TreeTestModel
+                    # API object is not used to list items from memory (set when connected to InvenTree server)
+                    inventree_api.inventree_api = getattr(inventree_api, 'inventree_api', None)
+                    inventree_api.invalidate_metadata('categories')
+                    by_path = {inventree_api.get_path({'by_pk': {item.pk: item for item in category_items}}, item): item.pk for item in category_items}
+                    # Same name in two branches
+                    TreeTestModel.items = category_items + [SimpleNamespace(pk=900, parent=by_path[('Resistors',)], name='0402')]
+                    # Full path, path not starting at root and unique name are found without reload
+                    for path, pk in [
+                        (['Capacitors', 'Ceramic', '0402'], by_path[('Capacitors', 'Ceramic', '0402')]),
+                        (['Ceramic', '0402'], by_path[('Capacitors', 'Ceramic', '0402')]),
+                        (['Capacitors'], by_path[('Capacitors',)]),
+                    ]:
+                        if inventree_api.get_tree_item_id('categories', path) != pk:
+                            print(f' [1] {path} ')
+                            method_success = False
+                    if inventree_api.get_tree_item_id('categories', ['Resistors', '0402']) != 900 or TreeTestModel.list_calls != 1:
+                        print(' [2] ')
+                        method_success = False
+                    # Category created by another client is found after full reload
+                    TreeTestModel.items.append(SimpleNamespace(pk=1000, parent=by_path[('Capacitors',)], name='New Category'))
+                    if inventree_api.find_tree_item_id('categories', ['Capacitors', 'New Category']) != -1 or TreeTestModel.list_calls != 1:
+                        print(' [3] ')
+                        method_success = False
+                    if inventree_api.get_tree_item_id('categories', ['Capacitors', 'New Category']) != 1000 or TreeTestModel.list_calls != 2:
+                        print(' [4] ')
+                        method_success = False
+                    # Missing category, or name is not unique
+                    if inventree_api.get_tree_item_id('categories', ['Capacitors', 'Missing']) != -1 or inventree_api.get_tree_item_id('categories', []) != -1:
+                        print(' [5] ')
+                        method_success = False
+                    if inventree_api.get_tree_item_id('categories', ['0402']) != -1:
+                        print(' [6] ')
+                        method_success = False
+                    inventree_api.METADATA_MODELS['categories'] = metadata_model
+                    inventree_api.invalidate_metadata('categories')
+
                 if method_success:
                     cprint('[ PASS ]')
                 else:
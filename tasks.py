@@ -1,7 +1,15 @@
 import webbrowser
 
 from kintree.common.tools import cprint
-from invoke import UnexpectedExit, task
+from invoke import Exit, UnexpectedExit, task
+
+# Startup time budget of entry points (seconds)
+STARTUP_BUDGET = {
+    # Scripts / CLI
+    'kintree.database.inventree_interface': 0.5,
+    # GUI (kintree_gui.py)
+    'kintree.kintree_gui': 1.5,
+}
 
 
 @task
@@ -76,6 +84,50 @@ def setup_inventree(c):
     c.run('python -m kintree.setup_inventree')
 
 
+@task
+def refresh_downloads(c):
+    """
+    Check downloaded images and datasheets for updates
+    """
+
+    c.run('python -c "from kintree.search import download_cache; download_cache.refresh_all()"')
+
+
+@task
+def download_stats(c, host=''):
+    """
+    Show image and datasheet download attempts and failure rate per host and strategy
+    """
+    import shlex
+
+    code = f'from kintree.common import download_stats; download_stats.print_stats({host!r})'
+    c.run(f'python -c {shlex.quote(code)}')
+
+
+@task
+def search_parts(c, supplier, parts='', file='', order_codes=False):
+    """
+    Search several parts with supplier and save results to cache (batched API requests when supported)
+
+    parts: comma-separated part numbers, file: text file with one part number per line,
+    order_codes: part numbers are supplier order codes (batched Farnell/Newark/Element14 searches)
+    """
+    import shlex
+
+    part_numbers = [part_number.strip() for part_number in parts.split(',') if part_number.strip()]
+    if file:
+        with open(file, 'r') as part_list:
+            part_numbers.extend(line.strip() for line in part_list if line.strip())
+    if not part_numbers:
+        cprint('[MAIN]\tError: Missing part numbers')
+        raise Exit(code=1)
+
+    code = ('from kintree.database import inventree_interface; '
+            f'inventree_interface.supplier_search_batch(inventree_interface.get_supplier_name({supplier!r}), {part_numbers!r}, '
+            f'order_codes={bool(order_codes)!r})')
+    c.run(f'python -c {shlex.quote(code)}')
+
+
 @task
 def coverage_report(c, open_browser=True):
     """
@@ -112,6 +164,34 @@ def test(c, enable_api=0):
         coverage_report(c, open_browser=False)
 
 
+@task
+def startup_benchmark(c, runs=5):
+    """
+    Check import time of Ki-nTree entry points against startup budget
+    """
+
+    over_budget = False
+    for module, budget in STARTUP_BUDGET.items():
+        timings = []
+        for _ in range(int(runs)):
+            result = c.run(
+                f'python -c "import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"',
+                hide=True,
+            )
+            timings.append(float(result.stdout.strip().splitlines()[-1]))
+
+        # Best run (first run may also create user configuration files)
+        timing = min(timings)
+        if timing > budget:
+            over_budget = True
+            cprint(f'[INFO]\tFailed: {module} startup took {timing:.3f}s (budget: {budget}s)')
+        else:
+            cprint(f'[INFO]\tSuccess: {module} startup took {timing:.3f}s (budget: {budget}s)')
+
+    if over_budget:
+        raise Exit(code=1)
+
+
 @task
 def python_badge(c):
     """